@@ -7,6 +7,8 @@ load_dotenv()
 class Config:
     # NVIDIA API
     API_KEY = os.getenv("NVIDIA_API_KEY", "").strip()
+    # Optional comma-separated key pool; falls back to the single API_KEY.
+    API_KEYS = [key.strip() for key in os.getenv("NVIDIA_API_KEYS", "").split(",") if key.strip()]
     BASE_URL = (os.getenv("NVIDIA_BASE_URL") or "https://integrate.api.nvidia.com/v1").strip()
     MODEL_NAME = (os.getenv("MODEL_NAME") or "qwen/qwen3-coder-480b-a35b-instruct").strip()
     
@@ -18,6 +20,9 @@ class Config:
     CHARS_PER_TOKEN_ESTIMATE = float(os.getenv("CHARS_PER_TOKEN_ESTIMATE", "4.0"))
     LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
     LLM_BACKOFF_SECONDS = float(os.getenv("LLM_BACKOFF_SECONDS", "2.0"))
+    LLM_CACHE_FILE = (os.getenv("LLM_CACHE_FILE") or "").strip()
+    LLM_TOTAL_DEADLINE_SECONDS = float(os.getenv("LLM_TOTAL_DEADLINE_SECONDS", "120"))
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
     LLM_SELF_HEALING_ATTEMPTS = int(os.getenv("LLM_SELF_HEALING_ATTEMPTS", "1"))
     REPORT_LOG_LINE_LIMIT = int(os.getenv("REPORT_LOG_LINE_LIMIT", "100"))
     CANDIDATE_VALIDATION_LIMIT = int(os.getenv("CANDIDATE_VALIDATION_LIMIT", "3"))
@@ -0,0 +1,83 @@
+"""Persistent on-disk cache of parsed ASTs.
+
+ast.parse dominates repeated scans over an unchanged tree, so parsed
+modules are pickled keyed by the SHA-256 of the source bytes (plus the
+interpreter version, since pickled AST nodes are not stable across
+Python releases). On a warm cache a parse collapses to a pickle.load.
+"""
+
+import ast
+import hashlib
+import mmap
+import os
+import pickle
+import sys
+import tempfile
+
+_CACHE_ROOT = os.path.join(
+    os.path.expanduser("~"), ".cache", "deepreview", "ast"
+)
+_VERSION_TAG = f"py{sys.version_info[0]}.{sys.version_info[1]}".encode()
+
+
+def _cache_path(digest: str) -> str:
+    # Two-level fan-out keeps individual directories small.
+    return os.path.join(_CACHE_ROOT, digest[:2], f"{digest}.pkl")
+
+
+def load_tree(path: str, src: bytes | None = None) -> ast.AST:
+    """Return the parsed AST for `path`, reusing a cached parse when the
+    source bytes are unchanged. Callers that already hold the source bytes
+    can pass them via `src` to avoid a second read; otherwise the file is
+    mmapped so hashing and parsing read straight from the page cache with
+    no heap copy. Raises OSError/SyntaxError like open() + compile() would;
+    cache failures silently fall back to parsing."""
+    if src is not None:
+        return _load(path, src)
+    with open(path, "rb") as handle:
+        try:
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Empty files (and exotic filesystems) cannot be mmapped.
+            return _load(path, handle.read())
+        with mapped:
+            return _load(path, mapped)
+
+
+def _load(path: str, src) -> ast.AST:
+    hasher = hashlib.sha256(_VERSION_TAG)
+    hasher.update(src)
+    cache_file = _cache_path(hasher.hexdigest())
+    try:
+        with open(cache_file, "rb") as handle:
+            return pickle.load(handle)
+    except Exception:
+        pass
+    # compile() is what ast.parse wraps; calling it directly with the raw
+    # bytes skips a Python-level layer and the eager UTF-8 decode (the
+    # parser honours encoding cookies itself).
+    tree = compile(src, path, "exec", flags=ast.PyCF_ONLY_AST)
+    _store(cache_file, tree)
+    return tree
+
+
+def _store(cache_file: str, tree: ast.AST) -> None:
+    try:
+        directory = os.path.dirname(cache_file)
+        os.makedirs(directory, exist_ok=True)
+        # Write to a temp file and os.replace so readers never see a
+        # partially written pickle.
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                pickle.dump(tree, handle, protocol=5)
+            os.replace(tmp_path, cache_file)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+    except Exception:
+        # Caching is best-effort; the caller already has the parse.
+        pass
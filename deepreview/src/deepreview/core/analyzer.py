@@ -1,8 +1,9 @@
 ﻿from __future__ import annotations
 
 import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 
 try:
     import tomllib
@@ -19,6 +20,30 @@ FRAMEWORK_HINTS = {
 }
 
 
+@lru_cache(maxsize=32)
+def _parse_pyproject_cached(path: str, mtime_ns: int) -> Optional[Dict[str, Any]]:
+    """Parse pyproject.toml once per (path, mtime); repeat analyzers hit memory."""
+    try:
+        return tomllib.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, tomllib.TOMLDecodeError):
+        return None
+
+
+@lru_cache(maxsize=32)
+def _read_text_cached(path: str, mtime_ns: int) -> Optional[str]:
+    try:
+        return Path(path).read_text(encoding="utf-8")
+    except OSError:
+        return None
+
+
+def _stat_mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
 class ProjectAnalyzer:
     """Collects lightweight metadata about a Python repository."""
 
@@ -27,7 +52,7 @@ class ProjectAnalyzer:
         self.entry_file: Optional[str] = None
         self.framework = "general"
         self.python_version: Optional[str] = None
-        self.dependencies: List[str] = []
+        self.dependencies: Set[str] = set()
         self.detected_frameworks: List[str] = []
         self.notes: List[str] = []
 
@@ -43,15 +68,19 @@ class ProjectAnalyzer:
         self._read_requirements()
         python_version_file = Path(self.root_dir, ".python-version")
         if python_version_file.exists() and not self.python_version:
-            self.python_version = python_version_file.read_text(encoding="utf-8").strip()
+            mtime_ns = _stat_mtime_ns(python_version_file)
+            if mtime_ns is not None:
+                content = _read_text_cached(str(python_version_file), mtime_ns)
+                if content is not None:
+                    self.python_version = content.strip()
 
     def _read_pyproject(self) -> None:
         pyproject_path = Path(self.root_dir, "pyproject.toml")
         if not pyproject_path.exists():
             return
-        try:
-            data = tomllib.loads(pyproject_path.read_text(encoding="utf-8"))
-        except (OSError, tomllib.TOMLDecodeError):
+        mtime_ns = _stat_mtime_ns(pyproject_path)
+        data = _parse_pyproject_cached(str(pyproject_path), mtime_ns) if mtime_ns is not None else None
+        if data is None:
             self.notes.append("pyproject.toml could not be parsed.")
             return
         project = data.get("project") or {}
@@ -59,13 +88,13 @@ class ProjectAnalyzer:
         if requires:
             self.python_version = requires
         deps = project.get("dependencies") or []
-        self.dependencies.extend(self._normalize_deps(deps))
+        self.dependencies.update(self._normalize_deps(deps))
         poetry = data.get("tool", {}).get("poetry", {})
         poetry_python = poetry.get("dependencies", {}).get("python")
         if poetry_python and not self.python_version:
             self.python_version = poetry_python
         poetry_deps = poetry.get("dependencies", {})
-        self.dependencies.extend(
+        self.dependencies.update(
             self._normalize_deps(dep for dep in poetry_deps if dep.lower() != "python")
         )
 
@@ -73,15 +102,17 @@ class ProjectAnalyzer:
         requirements_file = Path(self.root_dir, "requirements.txt")
         if not requirements_file.exists():
             return
-        try:
-            deps = [
-                line.strip()
-                for line in requirements_file.read_text(encoding="utf-8").splitlines()
-                if line.strip() and not line.strip().startswith("#")
-            ]
-            self.dependencies.extend(self._normalize_deps(deps))
-        except OSError:
+        mtime_ns = _stat_mtime_ns(requirements_file)
+        content = _read_text_cached(str(requirements_file), mtime_ns) if mtime_ns is not None else None
+        if content is None:
             self.notes.append("requirements.txt could not be read.")
+            return
+        deps = [
+            line.strip()
+            for line in content.splitlines()
+            if line.strip() and not line.strip().startswith("#")
+        ]
+        self.dependencies.update(self._normalize_deps(deps))
 
     def _normalize_deps(self, deps) -> List[str]:
         normalized: List[str] = []
@@ -94,27 +125,31 @@ class ProjectAnalyzer:
         return normalized
 
     def _detect_frameworks(self) -> None:
-        dep_lower = [d.lower() for d in self.dependencies]
+        # One joined blob turns the hint checks into plain substring scans
+        # instead of a per-hint loop over every dependency string.
+        dep_blob = "\n".join(dep.lower() for dep in self.dependencies)
         detected = set()
         for name, hints in FRAMEWORK_HINTS.items():
-            for hint in hints:
-                if any(hint in dep for dep in dep_lower):
-                    detected.add(name)
+            if any(hint in dep_blob for hint in hints):
+                detected.add(name)
         key_files = {
             "django": ["manage.py", "settings.py"],
             "flask": ["app.py"],
             "fastapi": ["main.py"],
         }
+        try:
+            root_entries = {entry.name for entry in os.scandir(self.root_dir)}
+        except OSError:
+            root_entries = set()
         for framework, files in key_files.items():
-            for file_name in files:
-                if Path(self.root_dir, file_name).exists():
-                    detected.add(framework)
+            if any(file_name in root_entries for file_name in files):
+                detected.add(framework)
         self.detected_frameworks = sorted(detected)
         if self.detected_frameworks:
             self.framework = self.detected_frameworks[0]
 
     def gather_metadata(self) -> Dict[str, Any]:
-        unique_deps = sorted({dep for dep in self.dependencies if dep})
+        unique_deps = sorted(self.dependencies)
         return {
             "python_version": self.python_version,
             "dependency_count": len(unique_deps),
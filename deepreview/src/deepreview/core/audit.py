@@ -2,10 +2,17 @@
 
 import os
 import re
+import sys
+from bisect import bisect_right
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Optional, Sequence, Tuple
 
+try:
+    import hyperscan
+except ImportError:  # pragma: no cover
+    hyperscan = None
+
 
 @dataclass(frozen=True)
 class HeuristicRule:
@@ -15,18 +22,23 @@ class HeuristicRule:
     description: str
     recommendation: str
 
+    def __post_init__(self) -> None:
+        # Rule names are repeated in every finding identity tuple; interning
+        # them makes those comparisons pointer checks.
+        object.__setattr__(self, "name", sys.intern(self.name))
+
 
 RULES: Tuple[HeuristicRule, ...] = (
     HeuristicRule(
         name="eval_exec_usage",
-        pattern=re.compile(r"\b(eval|exec)\s*\("),
+        pattern=re.compile(r"\b(?:eval|exec)\s*\("),
         severity="high",
         description="Detected direct use of eval/exec which can execute untrusted input.",
         recommendation="Avoid eval/exec. Use safe parsers or explicit dispatch tables instead.",
     ),
     HeuristicRule(
         name="pickle_untrusted",
-        pattern=re.compile(r"\b(pickle\.loads|pickle\.load)\s*\("),
+        pattern=re.compile(r"\b(?:pickle\.loads|pickle\.load)\s*\("),
         severity="high",
         description="Unpickling arbitrary data can lead to remote code execution.",
         recommendation="Only unpickle trusted sources or migrate to safe serialization formats (json, pydantic).",
@@ -40,21 +52,21 @@ RULES: Tuple[HeuristicRule, ...] = (
     ),
     HeuristicRule(
         name="subprocess_shell_true",
-        pattern=re.compile(r"\bsubprocess\.(run|popen|Popen)\s*\([^)]*shell\s*=\s*True"),
+        pattern=re.compile(r"\bsubprocess\.(?:run|popen|Popen)\s*\([^)]*shell\s*=\s*True"),
         severity="high",
         description="Subprocess executed with shell=True may enable command injection.",
         recommendation="Avoid shell=True, pass arguments as a list and validate user-controlled data.",
     ),
     HeuristicRule(
         name="weak_hash",
-        pattern=re.compile(r"\bhashlib\.(md5|sha1)\s*\("),
+        pattern=re.compile(r"\bhashlib\.(?:md5|sha1)\s*\("),
         severity="medium",
         description="MD5/SHA1 are weak for security-sensitive hashing.",
         recommendation="Use SHA-256 or stronger algorithms (hashlib.sha256/sha512 or blake2).",
     ),
     HeuristicRule(
         name="requests_insecure_verify",
-        pattern=re.compile(r"\brequests\.(get|post|put|delete|request)\s*\([^)]*verify\s*=\s*False"),
+        pattern=re.compile(r"\brequests\.(?:get|post|put|delete|request)\s*\([^)]*verify\s*=\s*False"),
         severity="medium",
         description="TLS verification disabled for HTTP requests.",
         recommendation="Remove verify=False or provide certificate pinning/truststore overrides.",
@@ -68,7 +80,7 @@ RULES: Tuple[HeuristicRule, ...] = (
     ),
     HeuristicRule(
         name="hardcoded_secret",
-        pattern=re.compile(r"(API_KEY|SECRET|TOKEN|PASSWORD)\s*=\s*['\"][^'\"]+['\"]"),
+        pattern=re.compile(r"(?:API_KEY|SECRET|TOKEN|PASSWORD)\s*=\s*['\"][^'\"]+['\"]"),
         severity="medium",
         description="Potential hard-coded credential found.",
         recommendation="Move secrets to environment variables or secret managers.",
@@ -83,29 +95,135 @@ RULES: Tuple[HeuristicRule, ...] = (
 )
 
 
+# Every default rule requires one of these literals, so lines without any of
+# them can skip the regex entirely (str `in` is far cheaper than a regex miss).
+RULE_KEYWORDS: Tuple[str, ...] = (
+    "eval",
+    "exec",
+    "pickle",
+    "yaml",
+    "subprocess",
+    "hashlib",
+    "requests",
+    "jwt",
+    "tempfile",
+    "API_KEY",
+    "SECRET",
+    "TOKEN",
+    "PASSWORD",
+)
+
+
+def _fuse_rules(rules: Tuple[HeuristicRule, ...]) -> Tuple[re.Pattern[str], Dict[str, HeuristicRule]]:
+    """Combine all rule patterns into one alternation so each line is scanned once."""
+    fused = re.compile("|".join(f"(?P<{rule.name}>{rule.pattern.pattern})" for rule in rules), re.ASCII)
+    return fused, {rule.name: rule for rule in rules}
+
+
+def _fuse_rules_bytes(rules: Tuple[HeuristicRule, ...]) -> Optional[re.Pattern[bytes]]:
+    """Bytes twin of the fused pattern so diff buffers are scanned without decoding.
+
+    Returns None when a custom rule cannot be expressed as an ASCII bytes
+    pattern; callers then decode each line and fall back to the str matcher.
+    """
+    try:
+        source = "|".join(f"(?P<{rule.name}>{rule.pattern.pattern})" for rule in rules).encode("ascii")
+    except UnicodeEncodeError:
+        return None
+    return re.compile(source, re.ASCII)
+
+
+FUSED, BY_NAME = _fuse_rules(RULES)
+FUSED_BYTES = _fuse_rules_bytes(RULES)
+RULE_KEYWORDS_BYTES: Tuple[bytes, ...] = tuple(keyword.encode("ascii") for keyword in RULE_KEYWORDS)
+
+
+def _build_hyperscan_db(rules: Tuple[HeuristicRule, ...]):
+    """Compile all rules into one hyperscan DFA, or None when unavailable."""
+    if hyperscan is None:
+        return None
+    db = hyperscan.Database()
+    try:
+        db.compile(
+            expressions=[rule.pattern.pattern.encode("utf-8") for rule in rules],
+            ids=list(range(len(rules))),
+            flags=[hyperscan.HS_FLAG_SOM_LEFTMOST] * len(rules),
+        )
+    except hyperscan.error:
+        return None
+    return db
+
+
+HYPERSCAN_DB = _build_hyperscan_db(RULES)
+
+
+# One token per diff line we care about; which named group matched tells the
+# scan loop how to advance its (file, line) state without inspecting the line.
+DIFF_TOKEN = re.compile(
+    rb"^(?:"
+    rb"\+\+\+ b/(?P<file>[^\r\n]*)"
+    rb"|\+\+\+[^\r\n]*"
+    rb"|@@(?P<hunk>[^\r\n]*)"
+    rb"|\+(?P<add>[^\r\n]*)"
+    rb"| (?P<ctx>)"
+    rb")",
+    re.MULTILINE,
+)
+
+
+def _line_starts(data: bytes) -> List[int]:
+    """Offsets of each line start, for mapping match offsets back to line numbers."""
+    starts = [0]
+    newline_at = data.find(b"\n")
+    while newline_at != -1:
+        starts.append(newline_at + 1)
+        newline_at = data.find(b"\n", newline_at + 1)
+    return starts
+
+
 class HeuristicAuditor:
     """Light-weight text heuristics to surface obvious risks without an LLM."""
 
     def __init__(self, rules: Tuple[HeuristicRule, ...] = RULES, scan_context: bool = False):
         self.rules = rules
         self.scan_context = scan_context
+        if rules is RULES:
+            self._fused, self._rules_by_name = FUSED, BY_NAME
+            self._fused_bytes = FUSED_BYTES
+            self._prefilter_keywords: Tuple[str, ...] | None = RULE_KEYWORDS
+            self._prefilter_keywords_bytes: Tuple[bytes, ...] | None = RULE_KEYWORDS_BYTES
+            self._hyperscan_db = HYPERSCAN_DB
+        else:
+            self._fused, self._rules_by_name = _fuse_rules(rules)
+            self._fused_bytes = _fuse_rules_bytes(rules)
+            self._prefilter_keywords = None
+            self._prefilter_keywords_bytes = None
+            self._hyperscan_db = _build_hyperscan_db(rules)
 
     def run(
         self,
-        diff_text: str,
-        context_text: Optional[str] = None,
+        diff_text: str | bytes,
+        context_text: Optional[str | bytes] = None,
         analysis_source: str = "diff",
     ) -> List[Dict[str, Optional[str]]]:
+        # Encode once up front: every scan below then works on bytes, and only
+        # lines that actually match a rule pay for a decode.
+        data = diff_text.encode("utf-8", errors="ignore") if isinstance(diff_text, str) else diff_text
         findings: List[Dict[str, Optional[str]]] = []
         seen: set[tuple[str, str | None, int | None]] = set()
-        findings.extend(self._scan_diff(diff_text, seen))
+        findings.extend(self._scan_diff(data, seen))
         normalized_source = (analysis_source or "diff").lower()
-        if diff_text and normalized_source == "snapshot":
-            findings.extend(self._scan_snapshot(diff_text, seen))
-        elif diff_text and normalized_source != "diff":
-            findings.extend(self._scan_plain(diff_text, source=normalized_source, seen=seen))
+        if data and normalized_source == "snapshot":
+            findings.extend(self._scan_snapshot(data, seen))
+        elif data and normalized_source != "diff":
+            findings.extend(self._scan_plain(data, source=normalized_source, seen=seen))
         if self.scan_context and context_text:
-            findings.extend(self._scan_plain(context_text, source="context", seen=seen))
+            context_data = (
+                context_text.encode("utf-8", errors="ignore")
+                if isinstance(context_text, str)
+                else context_text
+            )
+            findings.extend(self._scan_plain(context_data, source="context", seen=seen))
         return findings
 
     def run_workspace(
@@ -137,80 +255,140 @@ class HeuristicAuditor:
                 if file_name.endswith(".py"):
                     yield Path(current_root, file_name)
 
-    def _scan_diff(self, diff_text: str, seen: set[tuple[str, str | None, int | None]]) -> List[Dict[str, Optional[str]]]:
-        findings: List[Dict[str, Optional[str]]] = []
+    def _scan_diff(self, data: bytes, seen: set[tuple[str, str | None, int | None]]) -> List[Dict[str, Optional[str]]]:
+        # First pass: walk the diff once, collecting only the added lines along
+        # with their resolved (file, line) position. Second pass: batch those
+        # through the rule matcher, keeping the hot loop free of diff bookkeeping.
+        added: List[Tuple[Optional[str], Optional[int], bytes]] = []
         current_file: Optional[str] = None
         current_line: Optional[int] = None
+        record = added.append
 
-        for raw_line in diff_text.splitlines():
-            if raw_line.startswith("+++ b/"):
-                current_file = raw_line[6:].strip() or None
-                continue
-            if raw_line.startswith("@@"):
-                plus_index = raw_line.find("+")
+        for token in DIFF_TOKEN.finditer(data):
+            kind = token.lastgroup
+            if kind == "add":
+                current_line = current_line + 1 if current_line is not None else None
+                record((current_file, current_line, token.group("add")))
+            elif kind == "ctx":
+                current_line = current_line + 1 if current_line is not None else None
+            elif kind == "hunk":
+                hunk = token.group("hunk")
+                plus_index = hunk.find(b"+")
                 if plus_index != -1:
-                    segment = raw_line[plus_index + 1 :].split(" ", 1)[0]
-                    start = segment.split(",", 1)[0]
+                    segment = hunk[plus_index + 1 :].split(b" ", 1)[0]
+                    start = segment.split(b",", 1)[0]
                     try:
                         current_line = int(start) - 1
                     except ValueError:
                         current_line = None
-                continue
-            if not raw_line or raw_line[0] not in "+- ":
-                continue
-            if raw_line[0] == "+" and not raw_line.startswith("+++"):
-                current_line = current_line + 1 if current_line is not None else None
-                content = raw_line[1:]
-                findings.extend(
-                    self._match_rules(
-                        content,
-                        current_file,
-                        current_line,
-                        seen,
-                    )
-                )
-            elif raw_line[0] == " ":
-                current_line = current_line + 1 if current_line is not None else None
+            elif kind == "file":
+                decoded_path = token.group("file").strip().decode("utf-8", errors="replace")
+                current_file = sys.intern(decoded_path) if decoded_path else None
+
+        findings: List[Dict[str, Optional[str]]] = []
+        match_rules = self._match_rules_bytes
+        for file_path, line_number, content in added:
+            findings.extend(match_rules(content, file_path, line_number, seen))
         return findings
 
     def _scan_snapshot(
-        self, snapshot_text: str, seen: set[tuple[str, str | None, int | None]]
+        self, data: bytes, seen: set[tuple[str, str | None, int | None]]
     ) -> List[Dict[str, Optional[str]]]:
         findings: List[Dict[str, Optional[str]]] = []
         current_file: Optional[str] = None
         current_line: int = 0
-        for raw_line in snapshot_text.splitlines():
+        for raw_line in data.splitlines():
             stripped = raw_line.strip()
-            if stripped.startswith("--- File:"):
-                current_file = stripped.split(":", 1)[1].strip() or None
+            if stripped.startswith(b"--- File:"):
+                current_file = stripped.split(b":", 1)[1].strip().decode("utf-8", errors="replace") or None
                 current_line = 0
                 continue
-            if stripped.startswith("--- Untracked File:"):
-                current_file = stripped.split(":", 1)[1].strip() or None
+            if stripped.startswith(b"--- Untracked File:"):
+                current_file = stripped.split(b":", 1)[1].strip().decode("utf-8", errors="replace") or None
                 current_line = 0
                 continue
             current_line += 1
-            findings.extend(self._match_rules(raw_line, current_file, current_line, seen))
+            findings.extend(self._match_rules_bytes(raw_line, current_file, current_line, seen))
         return findings
 
     def _scan_plain(
         self,
-        text: str,
+        data: bytes,
         source: str,
         seen: set[tuple[str, str | None, int | None]],
     ) -> List[Dict[str, Optional[str]]]:
+        if self._hyperscan_db is not None:
+            return self._scan_buffer(data, source, seen)
+        if self._fused_bytes is None:
+            findings = []
+            for idx, raw_line in enumerate(data.splitlines(), start=1):
+                findings.extend(self._match_rules_bytes(raw_line, source, idx, seen))
+            return findings
+        # One finditer pass over the whole buffer beats splitting into lines and
+        # re-running the pattern on each; hits are mapped back via line offsets.
+        line_starts = _line_starts(data)
         findings: List[Dict[str, Optional[str]]] = []
-        for idx, raw_line in enumerate(text.splitlines(), start=1):
-            findings.extend(
-                self._match_rules(
-                    raw_line,
-                    source,
-                    idx,
-                    seen,
-                )
-            )
+        for match in self._fused_bytes.finditer(data):
+            line_index = bisect_right(line_starts, match.start()) - 1
+            line_start = line_starts[line_index]
+            line_end = data.find(b"\n", line_start)
+            if line_end == -1:
+                line_end = len(data)
+            line = data[line_start:line_end].decode("utf-8", errors="ignore")
+            rule = self._rules_by_name[match.lastgroup]
+            finding = self._build_finding(rule, line, source, line_index + 1, seen)
+            if finding:
+                findings.append(finding)
         return findings
 
+    def _scan_buffer(
+        self,
+        data: bytes,
+        source: str,
+        seen: set[tuple[str, str | None, int | None]],
+    ) -> List[Dict[str, Optional[str]]]:
+        """Scan the whole buffer in one hyperscan pass and map hits back to lines."""
+        line_starts = _line_starts(data)
+        findings: List[Dict[str, Optional[str]]] = []
+        rules = self.rules
+
+        def on_match(rule_id: int, start: int, end: int, flags: int, context) -> None:
+            line_index = bisect_right(line_starts, start) - 1
+            line_start = line_starts[line_index]
+            line_end = data.find(b"\n", line_start)
+            if line_end == -1:
+                line_end = len(data)
+            line = data[line_start:line_end].decode("utf-8", errors="ignore")
+            finding = self._build_finding(rules[rule_id], line, source, line_index + 1, seen)
+            if finding:
+                findings.append(finding)
+
+        self._hyperscan_db.scan(data, match_event_handler=on_match)
+        return findings
+
+    def _match_rules_bytes(
+        self,
+        line: bytes,
+        file_path: Optional[str],
+        line_number: Optional[int],
+        seen: set[tuple[str, str | None, int | None]],
+    ) -> List[Dict[str, Optional[str]]]:
+        keywords = self._prefilter_keywords_bytes
+        if keywords is not None and not any(keyword in line for keyword in keywords):
+            return []
+        if self._fused_bytes is None:
+            return self._match_rules(line.decode("utf-8", errors="ignore"), file_path, line_number, seen)
+        matches: List[Dict[str, Optional[str]]] = []
+        decoded: Optional[str] = None
+        for match in self._fused_bytes.finditer(line):
+            if decoded is None:
+                decoded = line.decode("utf-8", errors="ignore")
+            rule = self._rules_by_name[match.lastgroup]
+            finding = self._build_finding(rule, decoded, file_path, line_number, seen)
+            if finding:
+                matches.append(finding)
+        return matches
+
     def _match_rules(
         self,
         line: str,
@@ -218,28 +396,40 @@ class HeuristicAuditor:
         line_number: Optional[int],
         seen: set[tuple[str, str | None, int | None]],
     ) -> List[Dict[str, Optional[str]]]:
+        keywords = self._prefilter_keywords
+        if keywords is not None and not any(keyword in line for keyword in keywords):
+            return []
         matches: List[Dict[str, Optional[str]]] = []
-        for rule in self.rules:
-            if rule.name == "yaml_unsafe_load":
-                lowered = line.lower()
-                if any(token in lowered for token in ("safeloader", "csafeloader", "fullloader")):
-                    continue
-            if not rule.pattern.search(line):
-                continue
-            identity = (rule.name, file_path, line_number)
-            if identity in seen:
-                continue
-            seen.add(identity)
-            matches.append(
-                {
-                    "rule_id": rule.name,
-                    "title": rule.name.replace("_", " ").title(),
-                    "severity": rule.severity,
-                    "description": rule.description,
-                    "recommendation": rule.recommendation,
-                    "file": file_path,
-                    "line": line_number,
-                    "evidence": line.strip(),
-                }
-            )
+        for match in self._fused.finditer(line):
+            rule = self._rules_by_name[match.lastgroup]
+            finding = self._build_finding(rule, line, file_path, line_number, seen)
+            if finding:
+                matches.append(finding)
         return matches
+
+    def _build_finding(
+        self,
+        rule: HeuristicRule,
+        line: str,
+        file_path: Optional[str],
+        line_number: Optional[int],
+        seen: set[tuple[str, str | None, int | None]],
+    ) -> Optional[Dict[str, Optional[str]]]:
+        if rule.name == "yaml_unsafe_load":
+            lowered = line.lower()
+            if any(token in lowered for token in ("safeloader", "csafeloader", "fullloader")):
+                return None
+        identity = (rule.name, file_path, line_number)
+        if identity in seen:
+            return None
+        seen.add(identity)
+        return {
+            "rule_id": rule.name,
+            "title": rule.name.replace("_", " ").title(),
+            "severity": rule.severity,
+            "description": rule.description,
+            "recommendation": rule.recommendation,
+            "file": file_path,
+            "line": line_number,
+            "evidence": line.strip(),
+        }
@@ -1,64 +1,260 @@
 ﻿from __future__ import annotations
 
+import mmap
 import os
-import re
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache, lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Sequence, Set, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Set, Tuple
 
-import tree_sitter_python as tspython
-from tree_sitter import Language, Parser
+if TYPE_CHECKING:
+    from tree_sitter import Parser, Query
 
 from ..config import Config
 
 IGNORED_DIRECTORIES = {".git", ".venv", "venv", "__pycache__", "deepreview_runs", "deepreview"}
 
+# Below this size the mmap syscall overhead outweighs a plain read.
+MMAP_MIN_BYTES = 4096
+
+# Spawning a process pool only pays off once there is enough parsing to share.
+PARALLEL_INDEX_MIN_FILES = 32
+
+# Homonyms beyond this count add memory without improving lookups, which only
+# ever take the first entry; the rest are still reachable via _by_module.
+SYMBOL_BUCKET_CAP = 8
+
+INDEX_CACHE_NAME = os.path.join(".deepreview", "index.pkl")
+
+# Bumped whenever the pickled entry layout changes so stale caches are ignored.
+INDEX_CACHE_VERSION = 2
+
+DEFINITION_QUERY = (
+    "(function_definition name: (identifier) @name) @definition "
+    "(class_definition name: (identifier) @name) @definition"
+)
+DEPENDENCY_QUERY = (
+    "(import_statement) @import "
+    "(import_from_statement) @import_from "
+    "(call function: (_) @callee)"
+)
+
+def _iter_python_files(root: str):
+    """Yield .py paths under root using scandir, which reuses the cached dirent
+    type info instead of an extra stat per entry."""
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = os.scandir(current)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                name = entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if name not in IGNORED_DIRECTORIES:
+                        stack.append(entry.path)
+                elif name.endswith(".py") and entry.is_file(follow_symlinks=False):
+                    yield entry.path
+
+
+@cache
+def _tree_sitter():
+    """Import tree-sitter on first use; it loads native code and would otherwise
+    slow down every CLI invocation, including ones that never build an index."""
+    import tree_sitter_python as tspython
+    from tree_sitter import Language, Parser, Query, QueryCursor
+
+    return Language(tspython.language()), Parser, Query, QueryCursor
+
+
+# Per-process parser/query pair, built lazily inside pool workers because
+# tree-sitter objects cannot be pickled across process boundaries.
+_worker_tools: Tuple[Parser, Query] | None = None
+
+
+def _definition_tools() -> Tuple[Parser, Query]:
+    global _worker_tools
+    if _worker_tools is None:
+        language, parser_cls, query_cls, _ = _tree_sitter()
+        _worker_tools = (parser_cls(language), query_cls(language, DEFINITION_QUERY))
+    return _worker_tools
+
+
+def _extract_definitions(
+    file_path: str,
+    parser: Parser | None = None,
+    query: Query | None = None,
+) -> List[Tuple[str, int, int]]:
+    """Parse one file and return its (name, start_byte, end_byte) definitions."""
+    if parser is None or query is None:
+        parser, query = _definition_tools()
+    entries: List[Tuple[str, int, int]] = []
+    try:
+        with open(file_path, "rb") as handle:
+            if os.fstat(handle.fileno()).st_size < MMAP_MIN_BYTES:
+                _collect_definitions(parser, query, handle.read(), entries)
+            else:
+                with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    with memoryview(mapped) as source:
+                        _collect_definitions(parser, query, source, entries)
+    except (OSError, ValueError):
+        pass
+    return entries
+
+
+def _collect_definitions(
+    parser: Parser,
+    query: Query,
+    source: bytes | memoryview,
+    entries: List[Tuple[str, int, int]],
+) -> None:
+    query_cursor_cls = _tree_sitter()[3]
+    tree = parser.parse(source)
+    for _, captures in query_cursor_cls(query).matches(tree.root_node):
+        name_nodes = captures.get("name")
+        definition_nodes = captures.get("definition")
+        if not name_nodes or not definition_nodes:
+            continue
+        name = _buffer_text(name_nodes[0], source)
+        definition = definition_nodes[0]
+        entries.append((name, definition.start_byte, definition.end_byte))
+
+
+@lru_cache(maxsize=64)
+def _read_slice(file_path: str, start: int, end: int) -> str:
+    """Decode one byte range of a file; cached for repeatedly retrieved snippets."""
+    try:
+        with open(file_path, "rb") as handle:
+            handle.seek(start)
+            return handle.read(end - start).decode("utf-8", errors="ignore")
+    except OSError:
+        return ""
+
+
+def _buffer_text(node, source: bytes | memoryview) -> str:
+    if not node:
+        return ""
+    return bytes(source[node.start_byte: node.end_byte]).decode("utf-8", errors="ignore")
+
 
 class CodeContextManager:
     """Builds a light-weight semantic index and returns snippets to enrich LLM prompts."""
 
     def __init__(self, root_dir: str) -> None:
         self.root_dir = os.path.abspath(root_dir)
-        self.symbol_index: Dict[str, List[dict[str, str]]] = {}
-        self.language = Language(tspython.language())
-        self.parser = Parser(self.language)
+        self.symbol_index: Dict[str, List[Tuple[str, int, int]]] = {}
+        self._by_module: Dict[str, Dict[str, Tuple[str, int, int]]] = {}
+        self.overflowed_symbols: Set[str] = set()
+        # Dependency scans keyed by (mtime_ns, size): retrieve_context is called
+        # once per diff chunk and keeps hitting the same touched files.
+        self._file_deps: Dict[str, Tuple[Tuple[int, int], Tuple[Dict[str, dict], Set[str]]]] = {}
+        language, parser_cls, query_cls, _ = _tree_sitter()
+        self.language = language
+        self.parser = parser_cls(language)
+        self._definition_query = query_cls(language, DEFINITION_QUERY)
+        self._dependency_query = query_cls(language, DEPENDENCY_QUERY)
         approx_chars = (
             Config.MAX_CONTEXT_TOKENS * Config.CONTEXT_UTILIZATION_FRACTION * Config.CHARS_PER_TOKEN_ESTIMATE
         )
         self.context_budget_chars = int(approx_chars) if approx_chars > 0 else None
 
     def build_index(self) -> None:
-        """Walk the project and capture every function/class definition for later lookups."""
+        """Walk the project and capture every function/class definition for later lookups.
+
+        Results are cached on disk per file keyed by (mtime_ns, size), so repeat
+        runs only re-parse files whose stat changed.
+        """
         print(f"[Context] Building semantic index for {self.root_dir}...")
-        count = 0
-        for current_root, dirs, files in os.walk(self.root_dir):
-            dirs[:] = [d for d in dirs if d not in IGNORED_DIRECTORIES]
-            for file_name in files:
-                if not file_name.endswith(".py"):
-                    continue
-                path = os.path.join(current_root, file_name)
-                self._index_file(path)
-                count += 1
-        print(f"[Context] Indexed symbols from {count} Python files.")
+        paths = list(_iter_python_files(self.root_dir))
 
-    def _index_file(self, file_path: str) -> None:
+        cache = self._load_index_cache()
+        fresh_cache: Dict[str, Tuple[Tuple[int, int], List[Tuple[str, int, int]]]] = {}
+        to_parse: List[str] = []
+        stat_keys: Dict[str, Tuple[int, int]] = {}
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            key = (stat.st_mtime_ns, stat.st_size)
+            stat_keys[path] = key
+            cached = cache.get(path)
+            if cached and cached[0] == key:
+                self._merge_definitions(path, cached[1])
+                fresh_cache[path] = cached
+            else:
+                to_parse.append(path)
+
+        if len(to_parse) >= PARALLEL_INDEX_MIN_FILES:
+            with ProcessPoolExecutor() as executor:
+                results = executor.map(_extract_definitions, to_parse, chunksize=32)
+                for path, entries in zip(to_parse, results):
+                    self._merge_definitions(path, entries)
+                    fresh_cache[path] = (stat_keys[path], list(entries))
+        else:
+            for path in to_parse:
+                entries = _extract_definitions(path, self.parser, self._definition_query)
+                self._merge_definitions(path, entries)
+                fresh_cache[path] = (stat_keys[path], entries)
+
+        self._save_index_cache(fresh_cache)
+        reused = len(paths) - len(to_parse)
+        print(f"[Context] Indexed symbols from {len(paths)} Python files ({reused} from cache).")
+        if self.overflowed_symbols:
+            print(
+                f"[Context] {len(self.overflowed_symbols)} symbol name(s) exceeded "
+                f"{SYMBOL_BUCKET_CAP} definitions; extra homonyms indexed per module only."
+            )
+
+    def _load_index_cache(self) -> Dict[str, Tuple[Tuple[int, int], List[Tuple[str, int, int]]]]:
+        cache_path = Path(self.root_dir, INDEX_CACHE_NAME)
         try:
-            source = Path(file_path).read_bytes()
+            payload = pickle.loads(cache_path.read_bytes())
+        except (OSError, pickle.PickleError, EOFError, AttributeError):
+            return {}
+        if not isinstance(payload, tuple) or len(payload) != 2:
+            return {}
+        version, data = payload
+        if version != INDEX_CACHE_VERSION or not isinstance(data, dict):
+            return {}
+        return data
+
+    def _save_index_cache(self, cache: Dict[str, Tuple[Tuple[int, int], List[Tuple[str, int, int]]]]) -> None:
+        cache_path = Path(self.root_dir, INDEX_CACHE_NAME)
+        tmp_path = cache_path.with_suffix(".pkl.tmp")
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(
+                pickle.dumps((INDEX_CACHE_VERSION, cache), protocol=pickle.HIGHEST_PROTOCOL)
+            )
+            os.replace(tmp_path, cache_path)
         except OSError:
-            return
+            pass
 
-        tree = self.parser.parse(source)
-        self._visit_definition_nodes(tree.root_node, source, file_path)
+    def _index_file(self, file_path: str) -> None:
+        entries = _extract_definitions(file_path, self.parser, self._definition_query)
+        self._merge_definitions(file_path, entries)
 
-    def _visit_definition_nodes(self, node, source: bytes, file_path: str) -> None:
-        if node.type in {"function_definition", "class_definition"}:
-            name_node = node.child_by_field_name("name")
-            if name_node:
-                name = self._node_text(name_node, source)
-                body = self._node_text(node, source)
-                self.symbol_index.setdefault(name, []).append({"file": file_path, "body": body})
+    def _merge_definitions(self, file_path: str, entries: Sequence[Tuple[str, int, int]]) -> None:
+        module_name = self._module_name(file_path)
+        module_entries = self._by_module.setdefault(module_name, {})
+        for name, start, end in entries:
+            entry = (file_path, start, end)
+            bucket = self.symbol_index.setdefault(name, [])
+            if len(bucket) < SYMBOL_BUCKET_CAP:
+                bucket.append(entry)
+            else:
+                self.overflowed_symbols.add(name)
+            module_entries.setdefault(name, entry)
 
-        for child in node.children:
-            self._visit_definition_nodes(child, source, file_path)
+    def _module_name(self, file_path: str) -> str:
+        rel = os.path.relpath(file_path, self.root_dir)
+        if rel.endswith(".py"):
+            rel = rel[:-3]
+        return rel.replace("\\", "/").replace("/", ".")
 
     def retrieve_context(self, diff_text: str, include_paths: Optional[Sequence[str]] = None) -> str:
         """Return supplemental snippets for the files touched by the diff (or include_paths)."""
@@ -82,12 +278,16 @@ class CodeContextManager:
                 definition = self._resolve_definition(func_name, imports)
                 if not definition:
                     continue
-                key = (func_name, definition["file"])
+                def_file, start, end = definition
+                key = (func_name, def_file)
                 if key in seen_keys:
                     continue
+                body = _read_slice(def_file, start, end)
+                if not body:
+                    continue
                 snippet = (
-                    f"--- Definition of `{func_name}` (from {os.path.basename(definition['file'])}) ---\n"
-                    f"{definition['body']}\n"
+                    f"--- Definition of `{func_name}` (from {os.path.basename(def_file)}) ---\n"
+                    f"{body}\n"
                 )
                 snippet_len = len(snippet)
                 if self.context_budget_chars and (budget_used + snippet_len) > self.context_budget_chars:
@@ -99,46 +299,60 @@ class CodeContextManager:
         return "\n".join(context_snippets)
 
     def _extract_files_from_diff(self, diff_text: str) -> Set[str]:
-        files = set(re.findall(r"\+\+\+\s+b/(.*)", diff_text))
-        files.update(re.findall(r"--- File:\s*(.*)", diff_text))
-        files.update(re.findall(r"--- Untracked File:\s*(.*)", diff_text))
-        normalized = set()
-        for candidate in files:
-            cleaned = candidate.strip()
-            if not cleaned:
+        normalized: Set[str] = set()
+        for line in diff_text.splitlines():
+            if line.startswith("+++ b/"):
+                candidate = line[6:]
+            elif line.startswith("--- File:"):
+                candidate = line[9:]
+            elif line.startswith("--- Untracked File:"):
+                candidate = line[19:]
+            else:
                 continue
-            normalized.add(cleaned.replace("\\", "/"))
+            cleaned = candidate.strip()
+            if cleaned:
+                normalized.add(cleaned.replace("\\", "/"))
         return normalized
 
     def _analyze_file_dependencies(self, file_path: str) -> Tuple[Dict[str, dict], Set[str]]:
         imports: Dict[str, dict] = {}
         calls: Set[str] = set()
         try:
-            source_bytes = Path(file_path).read_bytes()
+            stat = os.stat(file_path)
         except OSError:
             return imports, calls
-
-        tree = self.parser.parse(source_bytes)
-        self._scan_ast(tree.root_node, source_bytes, imports, calls)
+        key = (stat.st_mtime_ns, stat.st_size)
+        cached = self._file_deps.get(file_path)
+        if cached and cached[0] == key:
+            return cached[1]
+        try:
+            with open(file_path, "rb") as handle:
+                if os.fstat(handle.fileno()).st_size < MMAP_MIN_BYTES:
+                    self._scan_dependencies(handle.read(), imports, calls)
+                else:
+                    with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        with memoryview(mapped) as source:
+                            self._scan_dependencies(source, imports, calls)
+        except (OSError, ValueError):
+            return imports, calls
+        self._file_deps[file_path] = (key, (imports, calls))
         return imports, calls
 
-    def _scan_ast(self, node, source: bytes, imports: Dict[str, dict], calls: Set[str]) -> None:
-        node_type = node.type
-        if node_type == "import_statement":
+    def _scan_dependencies(
+        self, source: bytes | memoryview, imports: Dict[str, dict], calls: Set[str]
+    ) -> None:
+        tree = self.parser.parse(source)
+        captures = _tree_sitter()[3](self._dependency_query).captures(tree.root_node)
+        for node in captures.get("import", []):
             self._handle_import_statement(node, source, imports)
-        elif node_type == "import_from_statement":
+        for node in captures.get("import_from", []):
             self._handle_import_from_statement(node, source, imports)
-        elif node_type == "call":
-            func_node = node.child_by_field_name("function")
-            if func_node:
-                name = self._node_text(func_node, source)
-                if name:
-                    calls.add(name.split(".")[-1])
-
-        for child in node.children:
-            self._scan_ast(child, source, imports, calls)
+        for node in captures.get("callee", []):
+            name = self._node_text(node, source)
+            if name:
+                calls.add(name.split(".")[-1])
 
-    def _handle_import_statement(self, node, source: bytes, imports: Dict[str, dict]) -> None:
+    def _handle_import_statement(self, node, source: bytes | memoryview, imports: Dict[str, dict]) -> None:
         for child in node.children:
             if child.type == "dotted_name":
                 name = self._node_text(child, source)
@@ -154,7 +368,7 @@ class CodeContextManager:
                     if name and alias:
                         imports[alias] = {"module": name, "name": name}
 
-    def _handle_import_from_statement(self, node, source: bytes, imports: Dict[str, dict]) -> None:
+    def _handle_import_from_statement(self, node, source: bytes | memoryview, imports: Dict[str, dict]) -> None:
         module_node = node.child_by_field_name("module_name")
         module_name = self._node_text(module_node, source) if module_node else ""
         for child in node.children:
@@ -172,23 +386,29 @@ class CodeContextManager:
                     if name and alias:
                         imports[alias] = {"module": module_name, "name": name}
 
-    def _resolve_definition(self, func_name: str, imports: Dict[str, dict]) -> Optional[dict[str, str]]:
+    def _resolve_definition(self, func_name: str, imports: Dict[str, dict]) -> Optional[Tuple[str, int, int]]:
+        import_entry = imports.get(func_name)
+        if import_entry:
+            target_name = import_entry.get("name") or func_name
+            target_key = target_name.split(".")[-1]
+            module = import_entry.get("module")
+            if module:
+                # Import-scoped lookup: O(1) and picks the right homonym.
+                module_entries = self._by_module.get(module)
+                if module_entries:
+                    entry = module_entries.get(target_key)
+                    if entry:
+                        return entry
         if func_name in self.symbol_index:
             return self.symbol_index[func_name][0]
-        import_entry = imports.get(func_name)
-        if not import_entry:
-            return None
-        target_name = import_entry.get("name") or func_name
-        target_key = target_name.split(".")[-1]
-        entries = self.symbol_index.get(target_key)
-        if entries:
-            return entries[0]
+        if import_entry:
+            entries = self.symbol_index.get(target_key)
+            if entries:
+                return entries[0]
         return None
 
-    def _node_text(self, node, source: bytes) -> str:
-        if not node:
-            return ""
-        return source[node.start_byte: node.end_byte].decode("utf-8", errors="ignore")
+    def _node_text(self, node, source: bytes | memoryview) -> str:
+        return _buffer_text(node, source)
 
     def _normalize_paths(self, paths: Sequence[str]) -> Set[str]:
         normalized: Set[str] = set()
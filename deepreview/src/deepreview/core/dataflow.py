@@ -1,15 +1,27 @@
 ﻿from __future__ import annotations
 
 import ast
+import hashlib
 import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from itertools import repeat
 from pathlib import Path
-from typing import Dict, List, Optional, Sequence, Set
+from typing import Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
 
-IGNORED_DIRS = {".git", ".venv", "venv", "__pycache__", "deepreview_runs", ".tox"}
+IGNORED_DIRS = frozenset({".git", ".venv", "venv", "__pycache__", "deepreview_runs", ".tox"})
 EXTENSIONS = (".py",)
 
-SOURCE_FUNCTIONS = {
+# Below this many files the pool startup costs more than it saves.
+PARALLEL_TAINT_MIN_FILES = 8
+
+# Per-file findings cache under the analyzed root, keyed by (mtime_ns, size);
+# bump the version whenever the finding layout changes.
+TAINT_CACHE_DIR = os.path.join("deepreview_runs", ".ast_cache")
+TAINT_CACHE_VERSION = 1
+
+SOURCE_FUNCTIONS = frozenset({
     "input",
     "builtins.input",
     "raw_input",
@@ -23,7 +35,7 @@ SOURCE_FUNCTIONS = {
     "os.environ.get",
     "os.getenv",
     "sys.argv",
-}
+})
 
 SINK_FUNCTIONS = {
     "os.system": "Command execution via os.system",
@@ -36,28 +48,16 @@ SINK_FUNCTIONS = {
     "builtins.exec": "Dynamic execution",
 }
 
-SQL_SINK_NAMES = {"execute", "executemany", "raw"}
+SQL_SINK_NAMES = frozenset({"execute", "executemany", "raw"})
 
 
-@dataclass(frozen=True)
-class TaintFinding:
-    title: str
-    severity: str
-    description: str
-    recommendation: str
-    file: Optional[str]
-    line: Optional[int]
-    function: Optional[str] = None
-    sink: Optional[str] = None
-
-
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FunctionSummary:
     name: str
-    param_names: List[str]
+    param_names: Tuple[str, ...]
     return_from_source: bool
-    return_from_params: Set[int]
-    sink_params: Set[int]
+    return_from_params: FrozenSet[int]
+    sink_params: FrozenSet[int]
 
 
 def analyze_taint(target_path: str, include_paths: Optional[Sequence[str]] = None) -> List[Dict[str, object]]:
@@ -66,48 +66,181 @@ def analyze_taint(target_path: str, include_paths: Optional[Sequence[str]] = Non
     if include_paths:
         include_set = {Path(p).as_posix() for p in include_paths}
 
-    findings: List[Dict[str, object]] = []
+    paths: List[str] = []
+    rel_paths: List[str] = []
     for file_path in _iter_python_files(root):
         rel_path = file_path.relative_to(root).as_posix()
         if include_set and rel_path not in include_set:
             continue
-        try:
-            code = file_path.read_text(encoding="utf-8")
-            tree = ast.parse(code, filename=rel_path)
-        except (OSError, SyntaxError):
-            continue
+        paths.append(str(file_path))
+        rel_paths.append(rel_path)
+
+    cache_dir = None
+    if os.environ.get("DEEPREVIEW_NOCACHE", "") not in {"1", "true", "True"}:
+        cache_dir = str(root / TAINT_CACHE_DIR)
+
+    findings: List[Dict[str, object]] = []
+    if len(paths) >= PARALLEL_TAINT_MIN_FILES:
+        # Each file is analyzed independently, so fan the CPU-bound AST work
+        # out across processes and merge the finding lists in input order.
+        with ProcessPoolExecutor() as executor:
+            for result in executor.map(_analyze_one, paths, rel_paths, repeat(cache_dir), chunksize=16):
+                findings.extend(result)
+    else:
+        for path, rel_path in zip(paths, rel_paths):
+            findings.extend(_analyze_one(path, rel_path, cache_dir))
+    return findings
 
-        summaries = _build_function_summaries(tree)
-        visitor = _TaintVisitor(rel_path, summaries)
-        visitor.visit(tree)
-        findings.extend(finding.__dict__ for finding in visitor.findings)
+
+def _analyze_one(
+    file_path: str,
+    rel_path: str,
+    cache_dir: Optional[str] = None,
+) -> List[Dict[str, object]]:
+    """Parse and taint-analyze a single file; standalone so pool workers can run it.
+
+    With cache_dir set, findings are reused from disk while the file's
+    (mtime_ns, size) is unchanged, so warm runs skip the parse and visit.
+    """
+    key = None
+    cache_path = None
+    if cache_dir is not None:
+        try:
+            stat = os.stat(file_path)
+            key = (TAINT_CACHE_VERSION, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            pass
+        else:
+            digest = hashlib.blake2b(rel_path.encode("utf-8"), digest_size=8).hexdigest()
+            cache_path = os.path.join(cache_dir, digest + ".pkl")
+            try:
+                with open(cache_path, "rb") as handle:
+                    cached_key, cached_findings = pickle.load(handle)
+                if cached_key == key:
+                    return cached_findings
+            except (OSError, pickle.PickleError, EOFError, ValueError):
+                pass
+
+    try:
+        # ast.parse accepts bytes and decodes per the source encoding itself;
+        # reading text here would just add a second pass over every byte.
+        tree = ast.parse(Path(file_path).read_bytes(), filename=rel_path)
+    except (OSError, SyntaxError, ValueError):
+        return []
+    summaries = _build_function_summaries(tree)
+    visitor = _TaintVisitor(rel_path, summaries)
+    visitor.visit(tree)
+    findings = visitor.findings
+
+    if cache_path is not None:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as handle:
+                pickle.dump((key, findings), handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
     return findings
 
 
 def _iter_python_files(root: Path):
-    for current_root, dirs, files in os.walk(root):
-        dirs[:] = [d for d in dirs if d not in IGNORED_DIRS]
-        for file_name in files:
-            if file_name.endswith(EXTENSIONS):
-                yield Path(current_root, file_name)
+    """Yield source paths under root via scandir, which reuses the dirent type
+    info from the directory read instead of paying an extra stat per entry."""
+    stack = [str(root)]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = os.scandir(current)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in IGNORED_DIRS:
+                        stack.append(entry.path)
+                elif entry.name.endswith(EXTENSIONS):
+                    yield Path(entry.path)
+
+
+# Which fields the expression walkers descend through, per node class; one
+# dict lookup here replaces the isinstance cascade jinja-style.
+_CHILDREN: Dict[type, tuple] = {
+    ast.Attribute: ("value",),
+    ast.Subscript: ("value", "slice"),
+    ast.BinOp: ("left", "right"),
+    ast.BoolOp: ("values",),
+    ast.JoinedStr: ("values",),
+    ast.List: ("elts",),
+    ast.Tuple: ("elts",),
+    ast.Set: ("elts",),
+    ast.Dict: ("keys", "values"),
+}
+
+
+# Sentinel distinguishing "not cached yet" from a cached empty string.
+_MISSING = object()
 
 
 def _qualified_name(node: ast.AST) -> str:
+    # The same func node is resolved by both visitor passes, so the result is
+    # stashed on the node itself; AST nodes accept arbitrary attributes.
+    q = getattr(node, "_qname", _MISSING)
+    if q is not _MISSING:
+        return q
     if isinstance(node, ast.Attribute):
         prefix = _qualified_name(node.value)
-        return f"{prefix}.{node.attr}" if prefix else node.attr
-    if isinstance(node, ast.Name):
-        return node.id
-    return ""
+        q = f"{prefix}.{node.attr}" if prefix else node.attr
+    elif isinstance(node, ast.Name):
+        q = node.id
+    else:
+        q = ""
+    try:
+        node._qname = q
+    except AttributeError:
+        pass
+    return q
 
 
 class _TaintVisitor(ast.NodeVisitor):
     def __init__(self, file_path: str, summaries: Dict[str, FunctionSummary]) -> None:
         self.file_path = file_path
         self.function_summaries = summaries
-        self.tainted: Set[str] = set()
-        self.findings: List[TaintFinding] = []
+        self.findings: List[Dict[str, object]] = []
         self.function_stack: List[str] = []
+        # Tainted names tracked as a bitmask over interned name ids: membership
+        # is a shift-and-mask instead of a string hash per Name node.
+        self._name_ids: Dict[str, int] = {}
+        self._tainted_mask: int = 0
+        # Memoized _expr_is_tainted results keyed by node id; flushed whenever
+        # the tainted mask grows since earlier answers may have become stale.
+        self._taint_cache: Dict[int, bool] = {}
+
+    def visit(self, node: ast.AST) -> None:
+        # One dict lookup instead of NodeVisitor's getattr('visit_' + name).
+        handler = self._DISPATCH.get(type(node))
+        if handler is not None:
+            handler(self, node)
+        else:
+            self.generic_visit(node)
+
+    def generic_visit(self, node: ast.AST) -> None:
+        # Statement children drive the analysis, and _expr_is_tainted already
+        # walks expression subtrees on demand -- so instead of dispatching
+        # visit() on every operand, expressions are scanned just for the
+        # nested Call nodes that visit_Call still has to classify.
+        exprs: List[ast.AST] = []
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.expr):
+                exprs.append(child)
+            else:
+                self.visit(child)
+        while exprs:
+            expr = exprs.pop()
+            if type(expr) is ast.Call:
+                self.visit_Call(expr)
+            else:
+                exprs.extend(ast.iter_child_nodes(expr))
 
     def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
         self.function_stack.append(node.name)
@@ -115,130 +248,152 @@ class _TaintVisitor(ast.NodeVisitor):
         self.function_stack.pop()
 
     def visit_Assign(self, node: ast.Assign) -> None:
-        value_tainted = self._expr_is_tainted(node.value) or self._is_source_call(node.value)
-        if value_tainted:
+        if self._expr_is_tainted(node.value):
             for target in node.targets:
-                for name in self._extract_names(target):
-                    self.tainted.add(name)
-        self.generic_visit(node.value)
+                for name in _extract_target_names(target):
+                    self._mark_tainted(name)
+        self.generic_visit(node)
 
     def visit_AnnAssign(self, node: ast.AnnAssign) -> None:
         if node.value:
-            value_tainted = self._expr_is_tainted(node.value) or self._is_source_call(node.value)
-            if value_tainted:
-                for name in self._extract_names(node.target):
-                    self.tainted.add(name)
-            self.generic_visit(node.value)
+            if self._expr_is_tainted(node.value):
+                for name in _extract_target_names(node.target):
+                    self._mark_tainted(name)
+            self.generic_visit(node)
 
     def visit_For(self, node: ast.For) -> None:
-        if self._expr_is_tainted(node.iter) or self._is_source_call(node.iter):
-            for name in self._extract_names(node.target):
-                self.tainted.add(name)
-        self.generic_visit(node.iter)
-        for stmt in node.body:
-            self.visit(stmt)
+        if self._expr_is_tainted(node.iter):
+            for name in _extract_target_names(node.target):
+                self._mark_tainted(name)
+        self.generic_visit(node)
 
     def visit_Call(self, node: ast.Call) -> None:
-        sink_reason = self._is_sink_call(node.func)
-        if sink_reason:
+        kind, detail = self._classify_call(node)
+        if kind == "sink":
             if any(self._expr_is_tainted(arg) for arg in node.args):
-                self._record_sink_finding(sink_reason, node)
+                self._record_sink_finding(detail, node)
             for keyword in node.keywords or []:
                 if self._expr_is_tainted(keyword.value):
-                    self._record_sink_finding(sink_reason, node)
-        elif self._is_source_call(node):
-            pass
-        else:
-            self._handle_user_function_sink(node)
+                    self._record_sink_finding(detail, node)
+        elif kind == "user":
+            self._handle_user_function_sink(node, self.function_summaries[detail])
         self.generic_visit(node)
 
     def _record_sink_finding(self, reason: str, node: ast.Call) -> None:
-        finding = TaintFinding(
-            title=f"Tainted data flows into {reason}",
-            severity="high",
-            description=f"Potentially untrusted input reaches {reason}.",
-            recommendation="Validate, sanitize, or escape user input before invoking this operation.",
-            file=self.file_path,
-            line=getattr(node, "lineno", None),
-            function=self._current_function(),
-            sink=reason,
-        )
-        self.findings.append(finding)
-
-    def _expr_is_tainted(self, node: ast.AST) -> bool:
-        if isinstance(node, ast.Name):
-            return node.id in self.tainted
-        if isinstance(node, ast.Call) and self._is_source_call(node):
-            return True
-        if isinstance(node, ast.Call):
-            summary = self._lookup_summary(node.func)
-            if summary:
-                if summary.return_from_source:
+        # Findings leave this module as plain dicts anyway; build them directly
+        # instead of routing through a dataclass that gets unwrapped later.
+        self.findings.append({
+            "title": f"Tainted data flows into {reason}",
+            "severity": "high",
+            "description": f"Potentially untrusted input reaches {reason}.",
+            "recommendation": "Validate, sanitize, or escape user input before invoking this operation.",
+            "file": self.file_path,
+            "line": getattr(node, "lineno", None),
+            "function": self._current_function(),
+            "sink": reason,
+        })
+
+    def _mark_tainted(self, name: str) -> None:
+        bit = 1 << self._name_ids.setdefault(name, len(self._name_ids))
+        if not self._tainted_mask & bit:
+            self._tainted_mask |= bit
+            self._taint_cache.clear()
+
+    def _expr_is_tainted(self, root: ast.AST) -> bool:
+        key = id(root)
+        cached = self._taint_cache.get(key)
+        if cached is None:
+            cached = self._expr_is_tainted_uncached(root)
+            self._taint_cache[key] = cached
+        return cached
+
+    def _expr_is_tainted_uncached(self, root: ast.AST) -> bool:
+        # Iterative worklist: deep BinOp/BoolOp/JoinedStr chains would otherwise
+        # pay one Python frame per nesting level.
+        stack: List[ast.AST] = [root]
+        while stack:
+            node = stack.pop()
+            node_type = type(node)
+            if node_type is ast.Name:
+                bit = self._name_ids.get(node.id)
+                if bit is not None and (self._tainted_mask >> bit) & 1:
                     return True
-                for idx in summary.return_from_params:
-                    arg = _get_argument_by_index(node, idx, summary.param_names)
-                    if arg is not None and self._expr_is_tainted(arg):
+            elif node_type is ast.Call:
+                kind, detail = self._classify_call(node)
+                if kind == "source":
+                    return True
+                if kind == "user":
+                    summary = self.function_summaries[detail]
+                    if summary.return_from_source:
                         return True
-        if isinstance(node, ast.Attribute):
-            return self._expr_is_tainted(node.value)
-        if isinstance(node, ast.Subscript):
-            return self._expr_is_tainted(node.value) or self._expr_is_tainted(node.slice)  # type: ignore[arg-type]
-        if isinstance(node, ast.BinOp):
-            return self._expr_is_tainted(node.left) or self._expr_is_tainted(node.right)
-        if isinstance(node, ast.BoolOp):
-            return any(self._expr_is_tainted(value) for value in node.values)
-        if isinstance(node, ast.JoinedStr):
-            return any(self._expr_is_tainted(value) for value in node.values)
-        if isinstance(node, ast.List) or isinstance(node, ast.Tuple) or isinstance(node, ast.Set):
-            return any(self._expr_is_tainted(elt) for elt in node.elts)
-        if isinstance(node, ast.Dict):
-            return any(self._expr_is_tainted(key) or self._expr_is_tainted(value) for key, value in zip(node.keys, node.values))
+                    for idx in summary.return_from_params:
+                        arg = _get_argument_by_index(node, idx, summary.param_names)
+                        if arg is not None:
+                            stack.append(arg)
+            else:
+                fields = _CHILDREN.get(node_type)
+                if fields is None:
+                    continue
+                for field in fields:
+                    value = getattr(node, field)
+                    if type(value) is list:
+                        stack.extend(child for child in value if child is not None)
+                    elif value is not None:
+                        stack.append(value)
         return False
 
-    def _is_source_call(self, node: ast.AST) -> bool:
-        if not isinstance(node, ast.Call):
-            return False
-        name = _qualified_name(node.func)
-        return name in SOURCE_FUNCTIONS
-
-    def _is_sink_call(self, node: ast.AST) -> Optional[str]:
-        name = _qualified_name(node)
-        if name in SINK_FUNCTIONS:
-            return SINK_FUNCTIONS[name]
-        if isinstance(node, ast.Attribute) and node.attr in SQL_SINK_NAMES:
-            return f"{node.attr} (possible SQL execution)"
-        return None
-
-    def _handle_user_function_sink(self, node: ast.Call) -> None:
-        summary = self._lookup_summary(node.func)
-        if not summary or not summary.sink_params:
+    def _classify_call(self, call: ast.Call) -> tuple:
+        """Resolve what a call node is in one pass: ("source"|"sink"|"user"|"none", detail).
+
+        The verdict only depends on the call target, so it is stashed on the
+        node itself -- visit_Call and _expr_is_tainted both hit the same nodes.
+        """
+        cached = getattr(call, "_call_kind", None)
+        if cached is not None:
+            return cached
+        name = _qualified_name(call.func)
+        if name in SOURCE_FUNCTIONS:
+            result = ("source", None)
+        elif name in SINK_FUNCTIONS:
+            result = ("sink", SINK_FUNCTIONS[name])
+        elif isinstance(call.func, ast.Attribute) and call.func.attr in SQL_SINK_NAMES:
+            result = ("sink", f"{call.func.attr} (possible SQL execution)")
+        elif name in self.function_summaries:
+            result = ("user", name)
+        else:
+            result = ("none", None)
+        call._call_kind = result
+        return result
+
+    def _handle_user_function_sink(self, node: ast.Call, summary: FunctionSummary) -> None:
+        if not summary.sink_params:
             return
         for idx in summary.sink_params:
             arg = _get_argument_by_index(node, idx, summary.param_names)
             if arg is not None and self._expr_is_tainted(arg):
-                finding = TaintFinding(
-                    title=f"Tainted argument flows through {summary.name}",
-                    severity="high",
-                    description=f"Helper '{summary.name}' routes tainted data into a sensitive sink.",
-                    recommendation="Sanitize within the helper or validate inputs before calling it.",
-                    file=self.file_path,
-                    line=getattr(node, "lineno", None),
-                    function=summary.name,
-                    sink="helper_sink",
-                )
-                self.findings.append(finding)
-
-    def _lookup_summary(self, node: ast.AST) -> Optional[FunctionSummary]:
-        name = _qualified_name(node)
-        return self.function_summaries.get(name)
+                self.findings.append({
+                    "title": f"Tainted argument flows through {summary.name}",
+                    "severity": "high",
+                    "description": f"Helper '{summary.name}' routes tainted data into a sensitive sink.",
+                    "recommendation": "Sanitize within the helper or validate inputs before calling it.",
+                    "file": self.file_path,
+                    "line": getattr(node, "lineno", None),
+                    "function": summary.name,
+                    "sink": "helper_sink",
+                })
 
     def _current_function(self) -> Optional[str]:
         if not self.function_stack:
             return None
         return ".".join(self.function_stack)
 
-    def _extract_names(self, target: ast.AST) -> Set[str]:
-        return _extract_target_names(target)
+    _DISPATCH = {
+        ast.FunctionDef: visit_FunctionDef,
+        ast.Assign: visit_Assign,
+        ast.AnnAssign: visit_AnnAssign,
+        ast.For: visit_For,
+        ast.Call: visit_Call,
+    }
 
 
 def _build_function_summaries(tree: ast.AST) -> Dict[str, FunctionSummary]:
@@ -251,117 +406,153 @@ def _build_function_summaries(tree: ast.AST) -> Dict[str, FunctionSummary]:
     return summaries
 
 
-class _FunctionAnalyzer(ast.NodeVisitor):
-    SOURCE_TOKEN = "source"
+# Origin masks: bit 0 marks a taint source, bit i + 1 marks parameter i.
+_SOURCE_BIT = 1
+
+
+def _param_indices(mask: int):
+    """Yield the parameter indices encoded in an origin mask."""
+    mask >>= 1
+    idx = 0
+    while mask:
+        if mask & 1:
+            yield idx
+        mask >>= 1
+        idx += 1
 
+
+class _FunctionAnalyzer(ast.NodeVisitor):
     def __init__(self, func_def: ast.FunctionDef) -> None:
         self.param_names = [arg.arg for arg in func_def.args.args]
-        self.tainted: Dict[str, Set[str]] = {}
-        for idx, name in enumerate(self.param_names):
-            self.tainted[name] = {self._param_token(idx)}
+        # Origins per name as int bitmasks: unions and membership tests become
+        # integer ops instead of set-of-string churn.
+        self.tainted: Dict[str, int] = {
+            name: 1 << (idx + 1) for idx, name in enumerate(self.param_names)
+        }
         self.return_from_source = False
         self.return_from_params: Set[int] = set()
         self.sink_params: Set[int] = set()
-
-    def _param_token(self, idx: int) -> str:
-        return f"param_{idx}"
+        # Memoized _expr_origins results keyed by node id; flushed whenever an
+        # assignment rebinds origins, which may invalidate earlier answers.
+        self._origin_cache: Dict[int, int] = {}
+
+    def visit(self, node: ast.AST) -> None:
+        # Same dispatch-table shortcut as _TaintVisitor.visit.
+        handler = self._DISPATCH.get(type(node))
+        if handler is not None:
+            handler(self, node)
+        else:
+            self.generic_visit(node)
 
     def summary(self, name: str) -> FunctionSummary:
         return FunctionSummary(
             name=name,
-            param_names=list(self.param_names),
+            param_names=tuple(self.param_names),
             return_from_source=self.return_from_source,
-            return_from_params=set(self.return_from_params),
-            sink_params=set(self.sink_params),
+            return_from_params=frozenset(self.return_from_params),
+            sink_params=frozenset(self.sink_params),
         )
 
     def visit_Return(self, node: ast.Return) -> None:
         if not node.value:
             return
-        origins = self._expr_origins(node.value)
-        for token in origins:
-            if token == self.SOURCE_TOKEN:
-                self.return_from_source = True
-            elif token.startswith("param_"):
-                idx = int(token.split("_", 1)[1])
-                self.return_from_params.add(idx)
+        mask = self._expr_origins(node.value)
+        if mask & _SOURCE_BIT:
+            self.return_from_source = True
+        self.return_from_params.update(_param_indices(mask))
         self.generic_visit(node)
 
     def visit_Assign(self, node: ast.Assign) -> None:
-        origins = self._expr_origins(node.value)
+        mask = self._expr_origins(node.value)
         for target in node.targets:
             for name in _extract_target_names(target):
-                self.tainted[name] = set(origins)
+                self.tainted[name] = mask
+        self._origin_cache.clear()
         self.generic_visit(node.value)
 
     def visit_AnnAssign(self, node: ast.AnnAssign) -> None:
         if node.value:
-            origins = self._expr_origins(node.value)
+            mask = self._expr_origins(node.value)
             for name in _extract_target_names(node.target):
-                self.tainted[name] = set(origins)
+                self.tainted[name] = mask
+            self._origin_cache.clear()
             self.generic_visit(node.value)
 
     def visit_For(self, node: ast.For) -> None:
-        origins = self._expr_origins(node.iter)
+        mask = self._expr_origins(node.iter)
         for name in _extract_target_names(node.target):
-            self.tainted[name] = set(origins)
+            self.tainted[name] = mask
+        self._origin_cache.clear()
         self.generic_visit(node.iter)
         for stmt in node.body:
             self.visit(stmt)
 
     def visit_Call(self, node: ast.Call) -> None:
-        reason = SINK_FUNCTIONS.get(_qualified_name(node.func))
-        if not reason and isinstance(node.func, ast.Attribute) and node.func.attr in SQL_SINK_NAMES:
-            reason = f"{node.func.attr} (possible SQL execution)"
-        if reason:
-            for idx, arg in enumerate(node.args):
-                for token in self._expr_origins(arg):
-                    if token.startswith("param_"):
-                        self.sink_params.add(int(token.split("_", 1)[1]))
-            for keyword in node.keywords or []:
-                for token in self._expr_origins(keyword.value):
-                    if token.startswith("param_") and keyword.arg in self.param_names:
-                        self.sink_params.add(self.param_names.index(keyword.arg))
+        # Most calls are not sinks: settle that from the func node alone and
+        # bail before any origin traversal. Single-attribute chains skip the
+        # recursive _qualified_name build entirely.
+        func = node.func
+        reason = None
+        if isinstance(func, ast.Name):
+            reason = SINK_FUNCTIONS.get(func.id)
+        elif isinstance(func, ast.Attribute):
+            if isinstance(func.value, ast.Name):
+                qualified = f"{func.value.id}.{func.attr}"
+            else:
+                qualified = _qualified_name(func)
+            reason = SINK_FUNCTIONS.get(qualified)
+            if reason is None and func.attr in SQL_SINK_NAMES:
+                reason = f"{func.attr} (possible SQL execution)"
+        if reason is None:
+            self.generic_visit(node)
+            return
+        for arg in node.args:
+            self.sink_params.update(_param_indices(self._expr_origins(arg)))
+        for keyword in node.keywords or []:
+            if self._expr_origins(keyword.value) >> 1 and keyword.arg in self.param_names:
+                self.sink_params.add(self.param_names.index(keyword.arg))
         self.generic_visit(node)
 
-    def _expr_origins(self, node: ast.AST) -> Set[str]:
-        if isinstance(node, ast.Name):
-            return set(self.tainted.get(node.id, set()))
-        if isinstance(node, ast.Call):
-            name = _qualified_name(node.func)
-            if name in SOURCE_FUNCTIONS:
-                return {self.SOURCE_TOKEN}
-        if isinstance(node, ast.Attribute):
-            return self._expr_origins(node.value)
-        if isinstance(node, ast.Subscript):
-            return self._expr_origins(node.value) | self._expr_origins(node.slice)  # type: ignore[arg-type]
-        if isinstance(node, ast.BinOp):
-            return self._expr_origins(node.left) | self._expr_origins(node.right)
-        if isinstance(node, ast.BoolOp):
-            origins: Set[str] = set()
-            for value in node.values:
-                origins |= self._expr_origins(value)
-            return origins
-        if isinstance(node, ast.JoinedStr):
-            origins: Set[str] = set()
-            for value in node.values:
-                origins |= self._expr_origins(value)
-            return origins
-        if isinstance(node, ast.List) or isinstance(node, ast.Tuple) or isinstance(node, ast.Set):
-            origins: Set[str] = set()
-            for elt in node.elts:
-                origins |= self._expr_origins(elt)
-            return origins
-        if isinstance(node, ast.Dict):
-            origins: Set[str] = set()
-            for key in node.keys:
-                if key:
-                    origins |= self._expr_origins(key)
-            for value in node.values:
-                if value:
-                    origins |= self._expr_origins(value)
-            return origins
-        return set()
+    def _expr_origins(self, root: ast.AST) -> int:
+        key = id(root)
+        cached = self._origin_cache.get(key)
+        if cached is None:
+            cached = self._expr_origins_uncached(root)
+            self._origin_cache[key] = cached
+        return cached
+
+    def _expr_origins_uncached(self, root: ast.AST) -> int:
+        # Same iterative shape as _TaintVisitor._expr_is_tainted, accumulating
+        # every origin bit instead of stopping at the first hit.
+        origins = 0
+        stack: List[ast.AST] = [root]
+        while stack:
+            node = stack.pop()
+            node_type = type(node)
+            if node_type is ast.Name:
+                origins |= self.tainted.get(node.id, 0)
+            elif node_type is ast.Call:
+                if _qualified_name(node.func) in SOURCE_FUNCTIONS:
+                    origins |= _SOURCE_BIT
+            else:
+                fields = _CHILDREN.get(node_type)
+                if fields is None:
+                    continue
+                for field in fields:
+                    value = getattr(node, field)
+                    if type(value) is list:
+                        stack.extend(child for child in value if child is not None)
+                    elif value is not None:
+                        stack.append(value)
+        return origins
+
+    _DISPATCH = {
+        ast.Return: visit_Return,
+        ast.Assign: visit_Assign,
+        ast.AnnAssign: visit_AnnAssign,
+        ast.For: visit_For,
+        ast.Call: visit_Call,
+    }
 
 
 def _extract_target_names(target: ast.AST) -> Set[str]:
@@ -1,4 +1,6 @@
+import io
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Iterable, Sequence
 
 import git
@@ -18,19 +20,20 @@ IGNORED_DIRECTORIES: Sequence[str] = (
 )
 DEFAULT_EXTENSIONS: Sequence[str] = (".py",)
 
+# Below this many snapshot files the thread pool costs more than it saves.
+SNAPSHOT_PARALLEL_MIN_FILES = 16
+
 def _normalize_paths(paths: Sequence[str] | None) -> list[str]:
     if not paths:
         return []
     return [p.replace("\\", "/").strip() for p in paths if p.strip()]
 
-def _matches(path: str, include_paths: Sequence[str] | None) -> bool:
-    if not include_paths:
-        return True
-    norm = path.replace("\\", "/")
-    for inc in include_paths:
-        if norm == inc or norm.startswith(inc.rstrip("/") + "/"):
-            return True
-    return False
+def _compile_includes(include_paths: Sequence[str]) -> tuple[frozenset, tuple]:
+    """Precompute the include filter: exact names plus a prefix tuple that
+    str.startswith scans in one C-level pass instead of a Python loop."""
+    exact = frozenset(include_paths)
+    prefixes = tuple(inc.rstrip("/") + "/" for inc in include_paths)
+    return exact, prefixes
 
 def get_git_diff(
     repo_path: str,
@@ -61,40 +64,63 @@ def get_git_diff(
             print(f"[Git] Warning: diff against {diff_target} failed: {exc}")
             return ""
 
-    full_diff: list[str] = []
+    # Stream sections into one buffer instead of accumulating a list that
+    # "\n\n".join would copy wholesale at the end.
+    buffer = io.StringIO()
 
-    try:
-        staged = _run_diff("--staged")
-        if staged:
-            full_diff.append("--- Staged Changes ---\n" + staged)
-    except Exception:
-        pass
+    # The staged and unstaged diffs are independent subprocesses; run them
+    # concurrently since the GIL is released while git does the work.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        staged_future = executor.submit(_run_diff, "--staged")
+        unstaged_future = executor.submit(_run_diff)
+
+        try:
+            staged = staged_future.result()
+            if staged:
+                buffer.write("--- Staged Changes ---\n")
+                buffer.write(staged)
+        except Exception:
+            pass
 
+        try:
+            unstaged = unstaged_future.result()
+            if unstaged:
+                if buffer.tell():
+                    buffer.write("\n\n")
+                buffer.write("--- Unstaged Changes ---\n")
+                buffer.write(unstaged)
+        except Exception:
+            pass
+
+    include_exact, include_prefixes = _compile_includes(include_paths)
+    # Same -z trick as get_changed_files: NUL-separated, already /-separated
+    # paths, and no quoting pass that repo.untracked_files would pay for.
     try:
-        unstaged = _run_diff()
-        if unstaged:
-            full_diff.append("--- Unstaged Changes ---\n" + unstaged)
+        raw_untracked = repo.git.ls_files("--others", "--exclude-standard", "-z")
     except Exception:
-        pass
-
-    for file in repo.untracked_files:
-        norm_file = file.replace("\\", "/")
+        raw_untracked = ""
+    for norm_file in raw_untracked.split("\0"):
+        if not norm_file:
+            continue
         if any(part in IGNORED_DIRECTORIES for part in norm_file.split("/")):
             continue
-        if include_paths and not _matches(norm_file, include_paths):
+        if include_paths and not (norm_file in include_exact or norm_file.startswith(include_prefixes)):
             continue
         if not norm_file.endswith(tuple(DEFAULT_EXTENSIONS)):
             continue
-        path = os.path.join(repo.working_dir, file)
+        path = os.path.join(repo.working_dir, norm_file)
         if not os.path.isfile(path):
             continue
         try:
             with open(path, "r", encoding="utf-8", errors="ignore") as handle:
                 content = handle.read()
-            full_diff.append(f"--- Untracked File: {norm_file} ---\n{content}")
         except Exception:
             continue
-    return "\n\n".join(section for section in full_diff if section.strip()).strip()
+        if buffer.tell():
+            buffer.write("\n\n")
+        buffer.write(f"--- Untracked File: {norm_file} ---\n")
+        buffer.write(content)
+    return buffer.getvalue().strip()
 
 def get_changed_files(repo_path: str, diff_target: str | None = None) -> list[str]:
     try:
@@ -103,20 +129,22 @@ def get_changed_files(repo_path: str, diff_target: str | None = None) -> list[st
         print(f"[Git] Error: {repo_path} is not a valid git repository.")
         return []
 
+    # -z output is NUL-separated and unquoted: no per-line strip, no surprises
+    # from filenames containing newlines, and git already emits forward
+    # slashes so no backslash normalization is needed.
     try:
         if diff_target:
-            names = repo.git.diff("--name-only", f"{diff_target}...HEAD").splitlines()
+            raw = repo.git.diff("--name-only", "-z", f"{diff_target}...HEAD")
         else:
-            names = repo.git.diff("--name-only").splitlines()
+            raw = repo.git.diff("--name-only", "-z")
     except Exception:
         try:
-            names = repo.git.diff("--name-only", "HEAD~1").splitlines()
+            raw = repo.git.diff("--name-only", "-z", "HEAD~1")
         except Exception:
-            names = []
+            raw = ""
 
     result: list[str] = []
-    for name in names:
-        norm = name.strip().replace("\\", "/")
+    for norm in raw.split("\0"):
         if not norm:
             continue
         if any(part in IGNORED_DIRECTORIES for part in norm.split("/")):
@@ -126,6 +154,31 @@ def get_changed_files(repo_path: str, diff_target: str | None = None) -> list[st
         result.append(norm)
     return sorted(set(result))
 
+def _iter_snapshot_files(root_dir: str, extensions: tuple) -> Iterable[tuple[str, str]]:
+    """Yield (path, rel_path) pairs via scandir, skipping ignored directories
+    without the per-entry stat that os.walk performs."""
+    stack = [root_dir]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = os.scandir(current)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in IGNORED_DIRECTORIES:
+                        stack.append(entry.path)
+                elif entry.name.endswith(extensions):
+                    yield entry.path, os.path.relpath(entry.path, root_dir)
+
+def _read_snapshot_file(path: str) -> str | None:
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as handle:
+            return handle.read()
+    except Exception:
+        return None
+
 def get_project_snapshot(root_dir: str,
                          extensions: Iterable[str] = DEFAULT_EXTENSIONS,
                          include_paths: Sequence[str] | None = None) -> str:
@@ -135,25 +188,37 @@ def get_project_snapshot(root_dir: str,
     matches `extensions`.
     """
     extensions = tuple(extensions) or DEFAULT_EXTENSIONS
-    sections = []
-    for current_root, dirs, files in os.walk(root_dir):
-        dirs[:] = [d for d in dirs if d not in IGNORED_DIRECTORIES]
-        for file_name in files:
-            if not file_name.endswith(extensions):
+    include_exact, include_prefixes = _compile_includes(include_paths or [])
+    candidates: list[tuple[str, str]] = []
+    for path, rel_path in _iter_snapshot_files(root_dir, extensions):
+        if include_paths:
+            norm = rel_path.replace("\\", "/")
+            if norm not in include_exact and not norm.startswith(include_prefixes):
                 continue
-            path = os.path.join(current_root, file_name)
-            rel_path = os.path.relpath(path, root_dir)
-            if include_paths and not _matches(rel_path.replace("\\", "/"), include_paths):
-                continue
-            try:
-                with open(path, "r", encoding="utf-8", errors="ignore") as handle:
-                    content = handle.read()
-                sections.append(f"--- File: {rel_path} ---\n{content}")
-            except Exception:
-                continue
-    snapshot = "\n\n".join(sections).strip()
+        candidates.append((path, rel_path))
+
+    if len(candidates) >= SNAPSHOT_PARALLEL_MIN_FILES:
+        # Reads release the GIL, so overlap them; sections stay in walk order
+        # because map preserves input order.
+        workers = min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            contents = list(executor.map(_read_snapshot_file, (path for path, _ in candidates)))
+    else:
+        contents = [_read_snapshot_file(path) for path, _ in candidates]
+
+    buffer = io.StringIO()
+    section_count = 0
+    for (_, rel_path), content in zip(candidates, contents):
+        if content is None:
+            continue
+        if section_count:
+            buffer.write("\n\n")
+        buffer.write(f"--- File: {rel_path} ---\n")
+        buffer.write(content)
+        section_count += 1
+    snapshot = buffer.getvalue().strip()
     if not snapshot:
         print("[Git] Warning: no text files found for snapshot.")
     else:
-        print(f"[Git] Built snapshot from {len(sections)} file(s).")
+        print(f"[Git] Built snapshot from {section_count} file(s).")
     return snapshot
@@ -1,32 +1,480 @@
 ﻿from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
+import os
+import random
 import re
 import textwrap
+import threading
 import time
+import weakref
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Any, Optional
 
-from openai import OpenAI
-
 from ..config import Config
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional speedup
+    tiktoken = None
+
+
+# Compiled once per process; the old class-level pattern had doubled
+# backslashes (matching a literal backslash + "s"), so real ```json fences
+# never hit this fast path and every response fell through to the slower
+# balanced-JSON scan.
+_FENCE_RE = re.compile(r"```(?P<lang>[a-zA-Z0-9_-]+)?\s*(?P<body>.*?)\s*```", re.DOTALL)
+
+# Shared decoder for raw_decode scans; construction is not free and the
+# instance is stateless.
+_JSON_DECODER = json.JSONDecoder()
+
+# Error triples resolved on first use so importing this module does not pull
+# in the openai package; the CLI's disabled-LLM path never pays that cost.
+_ERROR_CLASSES: Optional[tuple] = None
+
+
+def _error_classes() -> tuple:
+    """Return (retryable, permanent, throttling) openai exception tuples.
+
+    Retryable covers throttling, timeouts and provider 5xx; permanent covers
+    bad keys and malformed requests where a retry just burns quota;
+    throttling is the subset that puts a pool key on cooldown.
+    """
+    global _ERROR_CLASSES
+    if _ERROR_CLASSES is None:
+        import openai
+
+        _ERROR_CLASSES = (
+            (
+                openai.APITimeoutError,
+                openai.APIConnectionError,
+                openai.RateLimitError,
+                openai.InternalServerError,
+            ),
+            (openai.AuthenticationError, openai.BadRequestError),
+            (openai.RateLimitError, openai.InternalServerError),
+        )
+    return _ERROR_CLASSES
+
+# Hoisted so finding normalization does not rebuild a set literal per field.
+_SEVERITIES = frozenset({"critical", "high", "medium", "low", "info"})
+_CONFIDENCES = frozenset({"high", "medium", "low"})
+
+
+# Pins all deepreview requests to one provider-side prompt-cache bucket so
+# the static prefix (system prompt + schema + metadata) can hash-match
+# across invocations; bump the suffix when the prompt layout changes.
+_PROMPT_CACHE_KEY = f"deepreview-{Config.MODEL_NAME}-v1"
+
+
+# Templates are dedented once at import; per-call work is a single
+# format_map instead of re-scanning a ~40-line string in textwrap.
+_REVIEW_PROMPT_TEMPLATE = textwrap.dedent(
+    """
+    Perform a static security/code-quality review of the provided repository diff and context.
+
+    Respond ONLY with JSON matching this schema:
+    {{
+      "summary": "High-level assessment (1-2 sentences)",
+      "insights": ["Optional bullet guidance or next steps"],
+      "findings": [
+         {{
+           "title": "Short name of the risk",
+           "severity": "critical|high|medium|low|info",
+           "confidence": "high|medium|low",
+           "file": "relative/path.py",
+           "line": 123,
+           "description": "Explain the issue and why it matters",
+           "recommendation": "Concrete remediation guidance"
+         }}
+      ]
+    }}
+
+    Requirements:
+    - Focus on {limit_text} that the organization must review.
+    - Prefer referencing exact files/lines found in the diff/context.
+    - Do NOT invent behavior you cannot justify from the code.
+    - Output MUST start with '{{' and end with '}}' (no prose, no markdown fences).
+
+    Repository metadata:
+    {metadata_block}
+    {hint_block}
+    """
+).strip()
+
+_BATCH_HEADER_TEMPLATE = textwrap.dedent(
+    """
+    Perform a static security/code-quality review of EACH numbered item below.
+
+    Respond ONLY with JSON matching this schema:
+    {{
+      "items": [
+         {{
+           "id": 0,
+           "summary": "High-level assessment (1-2 sentences)",
+           "insights": ["Optional bullet guidance or next steps"],
+           "findings": [
+              {{
+                "title": "Short name of the risk",
+                "severity": "critical|high|medium|low|info",
+                "confidence": "high|medium|low",
+                "file": "relative/path.py",
+                "line": 123,
+                "description": "Explain the issue and why it matters",
+                "recommendation": "Concrete remediation guidance"
+              }}
+           ]
+         }}
+      ]
+    }}
+
+    Requirements:
+    - Return one entry per item id, in any order.
+    - Per item, focus on {limit_text} that the organization must review.
+    - Prefer referencing exact files/lines found in the diff/context.
+    - Do NOT invent behavior you cannot justify from the code.
+    - Output MUST start with '{{' and end with '}}' (no prose, no markdown fences).
+
+    Repository metadata:
+    {metadata_block}
+    {hint_block}
+    """
+).strip()
+
+_RETRY_TEMPLATE = textwrap.dedent(
+    """
+    Attempt {attempt} failed because the response was not valid JSON or missed required fields.
+    Return ONLY JSON matching the documented schema. Previous response snippet:
+    ```
+    {snippet}
+    ```
+    """
+).strip()
+
+
+# Structural JSON bytes; everything between them is skipped at C speed.
+_STRUCTURAL_RE = re.compile(r'["\\{}\[\]]')
+
+
+class _JsonStreamScanner:
+    """Incremental brace/string tracker for streamed completions.
+
+    feed() returns True once the first top-level JSON value has closed, at
+    which point the rest of the stream is provider filler (prose, whitespace,
+    or unused max_tokens budget) and can be dropped. Only structural
+    characters found by _STRUCTURAL_RE are inspected, so long string runs
+    cost regex matches instead of one Python iteration per character.
+    """
+
+    __slots__ = ("_depth", "_in_string", "_started", "_carry_escape", "done")
+
+    def __init__(self) -> None:
+        self._depth = 0
+        self._in_string = False
+        self._started = False
+        # True when the previous chunk ended inside a string with an odd run
+        # of backslashes, i.e. the next character is escaped.
+        self._carry_escape = False
+        self.done = False
+
+    def feed(self, text: str) -> bool:
+        if self.done:
+            return True
+        # A quote is escaped iff preceded by an odd run of backslashes ending
+        # right before it; runs show up as adjacent matches.
+        bs_parity = 1 if self._carry_escape else 0
+        bs_end = 0 if self._carry_escape else -1
+        for match in _STRUCTURAL_RE.finditer(text):
+            pos = match.start()
+            ch = text[pos]
+            if ch == "\\":
+                if self._in_string:
+                    bs_parity = bs_parity ^ 1 if bs_end == pos else 1
+                    bs_end = pos + 1
+                continue
+            if ch == '"':
+                escaped = self._in_string and bs_parity and bs_end == pos
+                bs_parity = 0
+                bs_end = -1
+                if self._in_string:
+                    if not escaped:
+                        self._in_string = False
+                elif self._started:
+                    self._in_string = True
+                continue
+            bs_parity = 0
+            bs_end = -1
+            if self._in_string:
+                continue
+            if ch == "{" or ch == "[":
+                self._started = True
+                self._depth += 1
+            elif self._started:
+                self._depth -= 1
+                if self._depth <= 0:
+                    self.done = True
+                    return True
+        self._carry_escape = bool(self._in_string and bs_parity and bs_end == len(text))
+        return False
+
+
+def _collect_stream(stream) -> str:
+    """Drain a sync completion stream, stopping once the JSON payload closes."""
+    parts: list[str] = []
+    scanner = _JsonStreamScanner()
+    try:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            parts.append(delta)
+            if scanner.feed(delta):
+                break
+    finally:
+        closer = getattr(stream, "close", None)
+        if closer is not None:
+            closer()
+    return "".join(parts)
+
+
+async def _collect_stream_async(stream) -> str:
+    parts: list[str] = []
+    scanner = _JsonStreamScanner()
+    try:
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            parts.append(delta)
+            if scanner.feed(delta):
+                break
+    finally:
+        closer = getattr(stream, "close", None)
+        if closer is not None:
+            result = closer()
+            if asyncio.iscoroutine(result):
+                await result
+    return "".join(parts)
+
+
+def _backoff_delay(base: float, attempt: int) -> float:
+    """Exponential backoff with jitter, capped at one minute."""
+    return min(60.0, (base or 1.0) * (2 ** (attempt - 1))) * random.uniform(0.5, 1.0)
+
+
+_ENCODER = None
+_ENCODER_LOADED = False
+
+
+def _get_encoder():
+    """Resolve a tiktoken encoder for the configured model once per process."""
+    global _ENCODER, _ENCODER_LOADED
+    if _ENCODER_LOADED:
+        return _ENCODER
+    _ENCODER_LOADED = True
+    if tiktoken is not None:
+        try:
+            _ENCODER = tiktoken.encoding_for_model(Config.MODEL_NAME)
+        except Exception:  # noqa: BLE001 - unknown model name
+            try:
+                _ENCODER = tiktoken.get_encoding("cl100k_base")
+            except Exception:  # noqa: BLE001
+                _ENCODER = None
+    return _ENCODER
+
+
+def _count_tokens(text: str) -> int:
+    encoder = _get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text))
+    return int(len(text) / Config.CHARS_PER_TOKEN_ESTIMATE) + 1
+
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Trim text to roughly max_tokens, preferring line/hunk boundaries."""
+    if max_tokens <= 0:
+        return ""
+    encoder = _get_encoder()
+    if encoder is not None:
+        ids = encoder.encode(text)
+        if len(ids) <= max_tokens:
+            return text
+        cut = encoder.decode(ids[:max_tokens])
+    else:
+        max_chars = int(max_tokens * Config.CHARS_PER_TOKEN_ESTIMATE)
+        if len(text) <= max_chars:
+            return text
+        cut = text[:max_chars]
+    # Dropping the partial trailing hunk keeps what remains reviewable; only
+    # fall back to a plain line cut when that would discard most of the text.
+    hunk_cut = cut.rfind("\n@@")
+    if hunk_cut > len(cut) // 2:
+        cut = cut[:hunk_cut]
+    elif "\n" in cut:
+        cut = cut.rsplit("\n", 1)[0]
+    return cut + "\n... [truncated to fit the model context]"
+
+
+def _json_loads(payload: str) -> Any:
+    """Decode with orjson when available (2-5x faster on big responses).
+
+    Both decoders raise ValueError subclasses on bad input.
+    """
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+def _json_dumps_indented(obj: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+
+@lru_cache(maxsize=32)
+def _render_static_prefix(template: str, metadata_json: str, hint_block: str, limit_text: str) -> str:
+    """Render a prompt's static portion once per distinct input combination.
+
+    Batch runs share one repo metadata dict across many files, so the
+    format_map over the multi-KB template collapses to a dict lookup after
+    the first review.
+    """
+    return template.format_map({
+        "metadata_block": metadata_json,
+        "hint_block": hint_block,
+        "limit_text": limit_text,
+    })
+
+
+def _render_review_payload(diff_content: str, context_content: str) -> str:
+    return (
+        "Diff to review:\n```\n"
+        f"{diff_content}\n```\n\n"
+        "Additional context (definitions, related code):\n```\n"
+        f"{context_content}\n```"
+    )
+
+
+class LLMResponseCache:
+    """Content-addressed cache for chat completions.
+
+    Only deterministic requests (temperature == 0) get a key, so a hit is
+    guaranteed to be the same answer the provider would return; everything
+    else bypasses the cache. Entries live in a small LRU with a TTL, and an
+    optional JSON file carries them across processes for CI reruns.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 128,
+        ttl_seconds: float = 3600.0,
+        disk_path: str | None = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_path = disk_path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        if disk_path:
+            self._load_disk()
+
+    @staticmethod
+    def cache_key(model: str, messages, temperature: float) -> Optional[str]:
+        if temperature != 0:
+            return None
+        blob = json.dumps([model, messages, temperature], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, content: str) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl_seconds, content)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        if self.disk_path:
+            self._save_disk()
+
+    def _load_disk(self) -> None:
+        try:
+            with open(self.disk_path, "r", encoding="utf-8") as handle:
+                raw = json.load(handle)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        with self._lock:
+            for key, (deadline, content) in raw.items():
+                if deadline >= now:
+                    self._entries[key] = (deadline, content)
+
+    def _save_disk(self) -> None:
+        with self._lock:
+            snapshot = dict(self._entries)
+        try:
+            os.makedirs(os.path.dirname(self.disk_path) or ".", exist_ok=True)
+            with open(self.disk_path, "w", encoding="utf-8") as handle:
+                json.dump(snapshot, handle)
+        except OSError:
+            pass
+
 
 class LLMClient:
     def __init__(self, max_retries: int | None = None):
         self.last_error: str | None = None
-        self.enabled = bool(Config.API_KEY and Config.BASE_URL and Config.MODEL_NAME)
-        if self.enabled:
-            try:
-                self.client = OpenAI(api_key=Config.API_KEY, base_url=Config.BASE_URL)
-            except Exception as exc:  # noqa: BLE001
-                self.last_error = str(exc)
-                self.enabled = False
-                self.client = None
-                print(f"[LLM] Error: failed to initialize client: {exc}")
-        else:
-            self.client = None
+        api_keys = Config.API_KEYS or ([Config.API_KEY] if Config.API_KEY else [])
+        self.enabled = bool(api_keys and Config.BASE_URL and Config.MODEL_NAME)
+        # One state record per key: a throttled key cools down while requests
+        # continue on the others instead of stalling every review.
+        self._key_states: list[dict[str, Any]] = [
+            {"key": key, "cooldown_until": 0.0, "consecutive_failures": 0}
+            for key in api_keys
+        ]
+        # Client objects (and the openai import itself) are built lazily on
+        # first request, keeping cold starts fast when the LLM is disabled.
+        self._clients: dict[str, Any] = {}
+        # Async clients and the concurrency semaphore bind to the event loop
+        # that created them (httpx pools keep-alive connections per loop, and
+        # asyncio.Semaphore attaches to the first loop that contends on it).
+        # review_changes starts a fresh loop per call via asyncio.run, so
+        # these live in a per-loop map instead of plain instance attributes;
+        # reusing them across loops raises "Event loop is closed" / "bound to
+        # a different event loop" mid-review.
+        self._loop_states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, Any]]" = (
+            weakref.WeakKeyDictionary()
+        )
         retries = Config.LLM_MAX_RETRIES if max_retries is None else max_retries
         self.max_attempts = max(1, retries)
+        self.cache = LLMResponseCache(disk_path=Config.LLM_CACHE_FILE or None)
+        # Pending futures keyed like the response cache; identical concurrent
+        # requests share one API call instead of racing duplicates.
+        self._inflight: dict[str, asyncio.Future] = {}
         self.backoff_seconds = max(0.0, Config.LLM_BACKOFF_SECONDS)
         if not self.enabled:
             if not Config.API_KEY:
@@ -36,22 +484,189 @@ class LLMClient:
             elif not Config.MODEL_NAME:
                 print("[LLM] MODEL_NAME missing; LLM review disabled.")
 
+    @property
+    def client(self):
+        """Sync client for the primary key, or None when disabled."""
+        if not self.enabled or not self._key_states:
+            return None
+        return self._client_for(self._key_states[0]["key"])
+
+    @property
+    def aclient(self):
+        """Async client for the primary key; must be read inside a running loop."""
+        if not self.enabled or not self._key_states:
+            return None
+        return self._aclient_for(self._key_states[0]["key"])
+
+    def _client_for(self, key: str):
+        client = self._clients.get(key)
+        if client is None:
+            from openai import OpenAI
+
+            client = OpenAI(api_key=key, base_url=Config.BASE_URL)
+            self._clients[key] = client
+        return client
+
+    def _loop_state(self) -> dict[str, Any]:
+        """Async resources for the running loop, created on first use.
+
+        Keyed weakly by the loop object so state from finished asyncio.run
+        invocations is dropped instead of leaking dead connection pools.
+        """
+        loop = asyncio.get_running_loop()
+        state = self._loop_states.get(loop)
+        if state is None:
+            state = {
+                "aclients": {},
+                # Bulkhead for the async path: caps in-flight requests so a
+                # large asyncio.gather cannot stampede the provider into
+                # blanket 429s.
+                "semaphore": asyncio.Semaphore(max(1, Config.LLM_MAX_CONCURRENCY)),
+            }
+            self._loop_states[loop] = state
+        return state
+
+    def _aclient_for(self, key: str):
+        aclients = self._loop_state()["aclients"]
+        client = aclients.get(key)
+        if client is None:
+            from openai import AsyncOpenAI
+
+            client = AsyncOpenAI(api_key=key, base_url=Config.BASE_URL)
+            aclients[key] = client
+        return client
+
+    def _pick_key_state(self) -> dict[str, Any]:
+        now = time.monotonic()
+        for state in self._key_states:
+            if now >= state["cooldown_until"]:
+                return state
+        # Every key is cooling down; use the one closest to recovery.
+        return min(self._key_states, key=lambda state: state["cooldown_until"])
+
+    def _key_throttled(self, state: dict[str, Any]) -> bool:
+        """Apply the exponential cooldown schedule; True if another key is free."""
+        state["consecutive_failures"] += 1
+        backoff_step = min(state["consecutive_failures"] - 1, 3)
+        state["cooldown_until"] = time.monotonic() + 60 * 5 ** backoff_step
+        now = time.monotonic()
+        return any(now >= other["cooldown_until"] for other in self._key_states)
+
+    def _key_recovered(self, state: dict[str, Any]) -> None:
+        state["consecutive_failures"] = 0
+        state["cooldown_until"] = 0.0
+
     def chat(self, messages) -> Optional[str]:
-        if not self.enabled or not self.client:
+        if not self.enabled or not self._key_states:
             return None
-        try:
-            completion = self.client.chat.completions.create(
-                model=Config.MODEL_NAME,
-                messages=messages,
-                temperature=Config.TEMPERATURE,
-                max_tokens=Config.MAX_TOKENS,
-            )
+        cache_key = LLMResponseCache.cache_key(Config.MODEL_NAME, messages, Config.TEMPERATURE)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self.last_error = None
+                return cached
+        retryable_errors, permanent_errors, throttling_errors = _error_classes()
+        for attempt in range(1, self.max_attempts + 1):
+            key_state = self._pick_key_state()
+            try:
+                # Streaming lets us stop paying output latency as soon as the
+                # JSON closes instead of waiting out the max_tokens budget.
+                stream = self._client_for(key_state["key"]).chat.completions.create(
+                    model=Config.MODEL_NAME,
+                    messages=messages,
+                    temperature=Config.TEMPERATURE,
+                    max_tokens=Config.MAX_TOKENS,
+                    extra_body={"prompt_cache_key": _PROMPT_CACHE_KEY},
+                    stream=True,
+                )
+                content = _collect_stream(stream)
+            except permanent_errors as exc:
+                self.last_error = str(exc)
+                print(f"[LLM] Error (not retryable): {exc}")
+                return None
+            except retryable_errors as exc:
+                self.last_error = str(exc)
+                print(f"[LLM] Transient error (attempt {attempt}/{self.max_attempts}): {exc}")
+                if isinstance(exc, throttling_errors):
+                    if self._key_throttled(key_state):
+                        continue  # another key is free; skip the sleep
+                if attempt < self.max_attempts:
+                    time.sleep(_backoff_delay(self.backoff_seconds, attempt))
+                continue
+            except Exception as exc:  # noqa: BLE001
+                self.last_error = str(exc)
+                print(f"[LLM] Error: {exc}")
+                return None
             self.last_error = None
-            return completion.choices[0].message.content
-        except Exception as exc:  # noqa: BLE001
-            self.last_error = str(exc)
-            print(f"[LLM] Error: {exc}")
+            self._key_recovered(key_state)
+            if cache_key is not None and content:
+                self.cache.put(cache_key, content)
+            return content
+        return None
+
+    async def achat(self, messages) -> Optional[str]:
+        if not self.enabled or not self._key_states:
             return None
+        semaphore = self._loop_state()["semaphore"]
+        cache_key = LLMResponseCache.cache_key(Config.MODEL_NAME, messages, Config.TEMPERATURE)
+        if cache_key is None:
+            async with semaphore:
+                return await self._achat_request(messages, cache_key)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            self.last_error = None
+            return cached
+        pending = self._inflight.get(cache_key)
+        if pending is not None:
+            return await pending
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        content: Optional[str] = None
+        try:
+            async with semaphore:
+                content = await self._achat_request(messages, cache_key)
+        finally:
+            self._inflight.pop(cache_key, None)
+            future.set_result(content)
+        return content
+
+    async def _achat_request(self, messages, cache_key: Optional[str]) -> Optional[str]:
+        retryable_errors, permanent_errors, throttling_errors = _error_classes()
+        for attempt in range(1, self.max_attempts + 1):
+            key_state = self._pick_key_state()
+            try:
+                stream = await self._aclient_for(key_state["key"]).chat.completions.create(
+                    model=Config.MODEL_NAME,
+                    messages=messages,
+                    temperature=Config.TEMPERATURE,
+                    max_tokens=Config.MAX_TOKENS,
+                    extra_body={"prompt_cache_key": _PROMPT_CACHE_KEY},
+                    stream=True,
+                )
+                content = await _collect_stream_async(stream)
+            except permanent_errors as exc:
+                self.last_error = str(exc)
+                print(f"[LLM] Error (not retryable): {exc}")
+                return None
+            except retryable_errors as exc:
+                self.last_error = str(exc)
+                print(f"[LLM] Transient error (attempt {attempt}/{self.max_attempts}): {exc}")
+                if isinstance(exc, throttling_errors):
+                    if self._key_throttled(key_state):
+                        continue  # another key is free; skip the sleep
+                if attempt < self.max_attempts:
+                    await asyncio.sleep(_backoff_delay(self.backoff_seconds, attempt))
+                continue
+            except Exception as exc:  # noqa: BLE001
+                self.last_error = str(exc)
+                print(f"[LLM] Error: {exc}")
+                return None
+            self.last_error = None
+            self._key_recovered(key_state)
+            if cache_key is not None and content:
+                self.cache.put(cache_key, content)
+            return content
+        return None
 
     def review_changes(
         self,
@@ -62,23 +677,42 @@ class LLMClient:
         max_findings: Optional[int] = None,
     ) -> dict[str, Any]:
         """Run a structured review of the diff and return JSON-friendly output."""
+        return asyncio.run(
+            self.areview_changes(
+                diff_content,
+                context_content,
+                metadata=metadata,
+                protocol_hints=protocol_hints,
+                max_findings=max_findings,
+            )
+        )
+
+    async def areview_changes(
+        self,
+        diff_content: str,
+        context_content: str,
+        metadata: Optional[dict[str, Any]] = None,
+        protocol_hints: Optional[str] = None,
+        max_findings: Optional[int] = None,
+    ) -> dict[str, Any]:
+        """Async review: callers reviewing many diffs can fan out with
+        asyncio.gather so network waits overlap instead of serializing."""
 
         self.last_error = None
         if not self.enabled:
-            return {
-                "summary": "LLM review disabled (missing configuration).",
-                "insights": ["Provide NVIDIA_API_KEY (and optional MODEL_NAME/NVIDIA_BASE_URL) in CI to enable LLM-based findings."],
-                "findings": [],
-                "error": self.last_error or "LLM disabled",
-            }
+            return self._disabled_payload()
 
-        prompt = self._build_review_prompt(
-            diff_content,
-            context_content,
+        # Static content (schema, requirements, repo metadata) goes in the
+        # leading turns and the volatile diff/context in the final turn, so the
+        # provider's prefix cache can hash-match everything before the diff.
+        static_prompt = self._build_review_prompt(
             metadata or {},
             protocol_hints,
             max_findings,
         )
+        diff_content, context_content = self._fit_to_token_budget(
+            static_prompt, diff_content, context_content
+        )
         messages = [
             {
                 "role": "system",
@@ -88,35 +722,43 @@ class LLMClient:
                     "and respond ONLY with valid JSON."
                 ),
             },
-            {"role": "user", "content": prompt},
+            {"role": "user", "content": static_prompt},
+            {"role": "user", "content": _render_review_payload(diff_content, context_content)},
         ]
 
+        prompt_turns = len(messages)
         last_response: str | None = None
         last_response_len = 0
-        for attempt in range(1, self.max_attempts + 1):
-            response = self.chat(messages)
-            last_response = response
-            last_response_len = len(response or "")
-            parsed = self._parse_review_response(response, max_findings)
-            if parsed is not None:
-                parsed.setdefault("raw_response_len", last_response_len)
-                parsed.setdefault("attempts", attempt)
-                return parsed
-            if response:
-                self.last_error = "LLM response was not valid JSON"
+        # Bound the whole retry conversation (requests, parsing, and backoff
+        # sleeps) so one stuck request cannot stall a gathered review batch.
+        total_deadline = Config.LLM_TOTAL_DEADLINE_SECONDS
+        try:
+            async with asyncio.timeout(total_deadline if total_deadline > 0 else None):
+                for attempt in range(1, self.max_attempts + 1):
+                    response = await self.achat(messages)
+                    last_response = response
+                    last_response_len = len(response or "")
+                    parsed = self._parse_review_response(response, max_findings)
+                    if parsed is not None:
+                        parsed.setdefault("raw_response_len", last_response_len)
+                        parsed.setdefault("attempts", attempt)
+                        return parsed
+                    if response:
+                        self.last_error = "LLM response was not valid JSON"
 
-            snippet = (response or "")[:400]
-            retry_instruction = textwrap.dedent(
-                f"""
-                Attempt {attempt} failed because the response was not valid JSON or missed required fields.
-                Return ONLY JSON matching the documented schema. Previous response snippet:
-                ```
-                {snippet}
-                ```
-                """
-            ).strip()
-            messages.append({"role": "user", "content": retry_instruction})
-            time.sleep(self.backoff_seconds * attempt)
+                    snippet = (response or "")[:400]
+                    retry_instruction = _RETRY_TEMPLATE.format(attempt=attempt, snippet=snippet)
+                    # Replace any earlier retry turn instead of appending: the
+                    # request body stays one instruction larger than the
+                    # original prompt no matter how many attempts run, and the
+                    # unchanged prefix stays eligible for the provider cache.
+                    if len(messages) > prompt_turns:
+                        messages[-1] = {"role": "user", "content": retry_instruction}
+                    else:
+                        messages.append({"role": "user", "content": retry_instruction})
+                    await asyncio.sleep(self.backoff_seconds * attempt)
+        except TimeoutError:
+            self.last_error = self.last_error or "LLM review deadline exceeded"
 
         error_payload: dict[str, Any] = {
             "summary": "",
@@ -130,61 +772,183 @@ class LLMClient:
             error_payload["raw_response_preview"] = last_response[:400]
         return error_payload
 
+    def review_changes_batch(
+        self,
+        items: list[dict[str, Any]],
+        metadata: Optional[dict[str, Any]] = None,
+        protocol_hints: Optional[str] = None,
+        max_findings: Optional[int] = None,
+    ) -> list[dict[str, Any]]:
+        """Review several diffs in one completion call.
+
+        Each item is a dict with "diff_content" and optional "context_content";
+        the diffs are packed into a single numbered prompt so N reviews pay for
+        one network round-trip and share the system-prompt prefix. Returns one
+        result per item, in input order.
+        """
+
+        self.last_error = None
+        if not items:
+            return []
+        if not self.enabled:
+            return [self._disabled_payload() for _ in items]
+
+        header, items_payload = self._build_batch_review_prompt(
+            items, metadata or {}, protocol_hints, max_findings
+        )
+        messages = [
+            {
+                "role": "system",
+                "content": (
+                    "You are a senior Python security auditor. "
+                    "Review code diffs conservatively, focus on actionable weaknesses, "
+                    "and respond ONLY with valid JSON."
+                ),
+            },
+            {"role": "user", "content": header},
+            {"role": "user", "content": items_payload},
+        ]
+
+        prompt_turns = len(messages)
+        for attempt in range(1, self.max_attempts + 1):
+            response = self.chat(messages)
+            results = self._parse_batch_response(response, len(items), max_findings)
+            if results is not None:
+                for result in results:
+                    result.setdefault("attempts", attempt)
+                return results
+            if response:
+                self.last_error = "LLM response was not valid JSON"
+            snippet = (response or "")[:400]
+            retry_instruction = _RETRY_TEMPLATE.format(attempt=attempt, snippet=snippet)
+            if len(messages) > prompt_turns:
+                messages[-1] = {"role": "user", "content": retry_instruction}
+            else:
+                messages.append({"role": "user", "content": retry_instruction})
+            time.sleep(self.backoff_seconds * attempt)
+
+        error_payload = {
+            "summary": "",
+            "insights": [],
+            "findings": [],
+            "error": self.last_error or "LLM request failed",
+            "attempts": self.max_attempts,
+        }
+        return [dict(error_payload) for _ in items]
+
+    def _disabled_payload(self) -> dict[str, Any]:
+        return {
+            "summary": "LLM review disabled (missing configuration).",
+            "insights": ["Provide NVIDIA_API_KEY (and optional MODEL_NAME/NVIDIA_BASE_URL) in CI to enable LLM-based findings."],
+            "findings": [],
+            "error": self.last_error or "LLM disabled",
+        }
+
+    def _build_batch_review_prompt(
+        self,
+        items: list[dict[str, Any]],
+        metadata: dict[str, Any],
+        protocol_hints: Optional[str],
+        max_findings: Optional[int],
+    ) -> tuple[str, str]:
+        header = _render_static_prefix(
+            _BATCH_HEADER_TEMPLATE,
+            _json_dumps_indented(metadata),
+            f"\nProtocol/analysis hints:\n{protocol_hints}" if protocol_hints else "",
+            f"up to {max_findings} findings" if max_findings else "the most critical findings",
+        )
+        sections = []
+        for idx, item in enumerate(items):
+            diff_content = item.get("diff_content") or ""
+            context_content = item.get("context_content") or ""
+            sections.append(
+                f"### Item {idx}\n"
+                f"Diff to review:\n```\n{diff_content}\n```\n"
+                f"Additional context (definitions, related code):\n```\n{context_content}\n```"
+            )
+        return header, "\n\n".join(sections)
+
+    def _parse_batch_response(
+        self,
+        response: Optional[str],
+        item_count: int,
+        max_findings: Optional[int],
+    ) -> Optional[list[dict[str, Any]]]:
+        if not response:
+            return None
+        payload = self._extract_json_payload(response)
+        if not payload:
+            return None
+        try:
+            data: Any = _json_loads(payload)
+        except ValueError:
+            return None
+        if not isinstance(data, dict) or not isinstance(data.get("items"), list):
+            return None
+
+        results: list[Optional[dict[str, Any]]] = [None] * item_count
+        for entry in data["items"]:
+            if not isinstance(entry, dict):
+                continue
+            try:
+                idx = int(entry.get("id"))
+            except (TypeError, ValueError):
+                continue
+            if not 0 <= idx < item_count:
+                continue
+            results[idx] = self._normalize_review_data(entry, max_findings)
+        return [
+            result
+            if result is not None
+            else {"summary": "", "insights": [], "findings": [], "error": "missing item in batch response"}
+            for result in results
+        ]
+
+    def _fit_to_token_budget(
+        self, static_prompt: str, diff_content: str, context_content: str
+    ) -> tuple[str, str]:
+        """Pre-truncate diff/context so the request fits the context window.
+
+        Sending tokens the provider would reject (or truncate server-side)
+        wastes upload bandwidth and, on context-length 400s, a whole round
+        trip. The diff gets priority; context fills whatever budget is left.
+        """
+        budget = (
+            int(Config.MAX_CONTEXT_TOKENS * Config.CONTEXT_UTILIZATION_FRACTION)
+            - Config.MAX_TOKENS
+            - _count_tokens(static_prompt)
+        )
+        if budget <= 0:
+            return diff_content, context_content
+        diff_tokens = _count_tokens(diff_content)
+        context_tokens = _count_tokens(context_content)
+        if diff_tokens + context_tokens <= budget:
+            return diff_content, context_content
+        half = budget // 2
+        diff_budget = min(diff_tokens, max(half, budget - context_tokens))
+        context_budget = budget - diff_budget
+        if diff_tokens > diff_budget:
+            diff_content = _truncate_to_tokens(diff_content, diff_budget)
+        if context_tokens > context_budget:
+            context_content = _truncate_to_tokens(context_content, context_budget)
+        print(
+            f"[LLM] Input exceeded the context budget ({budget} tokens); "
+            "diff/context truncated."
+        )
+        return diff_content, context_content
+
     def _build_review_prompt(
         self,
-        diff_content: str,
-        context_content: str,
         metadata: dict[str, Any],
         protocol_hints: Optional[str],
         max_findings: Optional[int],
     ) -> str:
-        metadata_block = json.dumps(metadata, indent=2, ensure_ascii=False)
-        hint_block = f"\nProtocol/analysis hints:\n{protocol_hints}" if protocol_hints else ""
-        limit_text = f"up to {max_findings} findings" if max_findings else "the most critical findings"
-        return textwrap.dedent(
-            f"""
-            Perform a static security/code-quality review of the provided repository diff and context.
-
-            Respond ONLY with JSON matching this schema:
-            {{
-              "summary": "High-level assessment (1-2 sentences)",
-              "insights": ["Optional bullet guidance or next steps"],
-              "findings": [
-                 {{
-                   "title": "Short name of the risk",
-                   "severity": "critical|high|medium|low|info",
-                   "confidence": "high|medium|low",
-                   "file": "relative/path.py",
-                   "line": 123,
-                   "description": "Explain the issue and why it matters",
-                   "recommendation": "Concrete remediation guidance"
-                 }}
-              ]
-            }}
-
-            Requirements:
-            - Focus on {limit_text} that the organization must review.
-            - Prefer referencing exact files/lines found in the diff/context.
-            - Do NOT invent behavior you cannot justify from the code.
-            - Output MUST start with '{{' and end with '}}' (no prose, no markdown fences).
-
-            Repository metadata:
-            {metadata_block}
-            {hint_block}
-
-            Diff to review:
-            ```
-            {diff_content}
-            ```
-
-            Additional context (definitions, related code):
-            ```
-            {context_content}
-            ```
-            """
-        ).strip()
-
-    _FENCE_RE = re.compile(r"```(?P<lang>[a-zA-Z0-9_-]+)?\\s*(?P<body>.*?)\\s*```", re.DOTALL)
+        return _render_static_prefix(
+            _REVIEW_PROMPT_TEMPLATE,
+            _json_dumps_indented(metadata),
+            f"\nProtocol/analysis hints:\n{protocol_hints}" if protocol_hints else "",
+            f"up to {max_findings} findings" if max_findings else "the most critical findings",
+        )
 
     def _parse_review_response(
         self, response: Optional[str], max_findings: Optional[int]
@@ -197,10 +961,14 @@ class LLMClient:
             return None
 
         try:
-            data: Any = json.loads(payload)
-        except json.JSONDecodeError:
+            data: Any = _json_loads(payload)
+        except ValueError:
             return None
+        return self._normalize_review_data(data, max_findings)
 
+    def _normalize_review_data(
+        self, data: Any, max_findings: Optional[int]
+    ) -> Optional[dict[str, Any]]:
         if isinstance(data, list):
             data = {"summary": "", "insights": [], "findings": data}
         if not isinstance(data, dict):
@@ -208,27 +976,32 @@ class LLMClient:
 
         findings: list[dict[str, Any]] = []
         findings_field = data.get("findings") or data.get("issues") or data.get("risks") or []
+        # Stop normalizing once the cap is reached; trailing findings would be
+        # sliced away anyway. Bound methods are hoisted out of the loop.
+        limit = max_findings if max_findings is not None and max_findings > 0 else None
+        append = findings.append
+        normalize_severity = self._normalize_severity
+        normalize_confidence = self._normalize_confidence
         for item in findings_field or []:
+            if limit is not None and len(findings) >= limit:
+                break
             if not isinstance(item, dict):
                 continue
-            line_value = item.get("line") or item.get("line_number") or item.get("lineNo")
+            get = item.get
+            line_value = get("line") or get("line_number") or get("lineNo")
             try:
                 line_number = int(line_value) if line_value is not None else None
             except (TypeError, ValueError):
                 line_number = None
-            finding = {
-                "title": (item.get("title") or "Untitled finding").strip(),
-                "severity": self._normalize_severity(item.get("severity")),
-                "confidence": self._normalize_confidence(item.get("confidence")),
-                "file": (item.get("file") or item.get("path") or "").strip(),
+            append({
+                "title": (get("title") or "Untitled finding").strip(),
+                "severity": normalize_severity(get("severity")),
+                "confidence": normalize_confidence(get("confidence")),
+                "file": (get("file") or get("path") or "").strip(),
                 "line": line_number,
-                "description": (item.get("description") or item.get("rationale") or "").strip(),
-                "recommendation": (item.get("recommendation") or item.get("remediation") or "").strip(),
-            }
-            findings.append(finding)
-
-        if max_findings is not None and max_findings > 0:
-            findings = findings[: max_findings]
+                "description": (get("description") or get("rationale") or "").strip(),
+                "recommendation": (get("recommendation") or get("remediation") or "").strip(),
+            })
 
         insights_field = (
             data.get("insights")
@@ -237,7 +1010,9 @@ class LLMClient:
             or data.get("notes")
             or []
         )
-        insights = [str(item).strip() for item in insights_field if str(item).strip()]
+        insights = [
+            text for item in insights_field if (text := str(item).strip())
+        ]
 
         summary = str(data.get("summary", "")).strip()
         return {
@@ -247,22 +1022,32 @@ class LLMClient:
         }
 
     def _normalize_severity(self, value: Any) -> str:
-        normalized = str(value or "").strip().lower()
-        if normalized in {"critical", "high", "medium", "low", "info"}:
-            return normalized
-        return "info"
+        if not isinstance(value, str):
+            value = str(value or "")
+        normalized = value.strip().lower()
+        return normalized if normalized in _SEVERITIES else "info"
 
     def _normalize_confidence(self, value: Any) -> str:
-        normalized = str(value or "").strip().lower()
-        if normalized in {"high", "medium", "low"}:
-            return normalized
-        return "medium"
+        if not isinstance(value, str):
+            value = str(value or "")
+        normalized = value.strip().lower()
+        return normalized if normalized in _CONFIDENCES else "medium"
 
     def _extract_json_payload(self, response: str) -> str | None:
         stripped = (response or "").strip()
         if not stripped:
             return None
 
+        # Well-behaved responses obey the "start with '{'" instruction; one
+        # raw_decode settles those without any fence or balance scanning.
+        if stripped[0] in "{[":
+            try:
+                _, end = _JSON_DECODER.raw_decode(stripped)
+            except json.JSONDecodeError:
+                pass
+            else:
+                return stripped[:end]
+
         fenced = self._extract_fenced_payload(stripped)
         if fenced:
             candidate = fenced.strip()
@@ -278,7 +1063,7 @@ class LLMClient:
         return None
 
     def _extract_fenced_payload(self, text: str) -> str | None:
-        matches = list(self._FENCE_RE.finditer(text))
+        matches = list(_FENCE_RE.finditer(text))
         if not matches:
             return None
 
@@ -312,38 +1097,20 @@ class LLMClient:
         if first_object == -1 and first_array == -1:
             return None
         if first_object == -1:
-            start = first_array
-            open_char, close_char = "[", "]"
+            start, open_char = first_array, "["
         elif first_array == -1:
-            start = first_object
-            open_char, close_char = "{", "}"
+            start, open_char = first_object, "{"
         else:
             start = min(first_object, first_array)
-            open_char, close_char = ("{", "}") if start == first_object else ("[", "]")
-
-        depth = 0
-        in_string = False
-        escape = False
-        for idx in range(start, len(text)):
-            ch = text[idx]
-            if in_string:
-                if escape:
-                    escape = False
-                elif ch == "\\":
-                    escape = True
-                elif ch == "\"":
-                    in_string = False
-                continue
+            open_char = "{" if start == first_object else "["
 
-            if ch == "\"":
-                in_string = True
-                continue
-            if ch == open_char:
-                depth += 1
+        # raw_decode runs the brace/string/escape state machine in C, so each
+        # candidate costs one library call instead of a Python loop per char.
+        while start != -1:
+            try:
+                _, end = _JSON_DECODER.raw_decode(text, start)
+            except json.JSONDecodeError:
+                start = text.find(open_char, start + 1)
                 continue
-            if ch == close_char:
-                depth -= 1
-                if depth == 0:
-                    return text[start : idx + 1]
-
+            return text[start:end]
         return None
@@ -1,7 +1,39 @@
 import ast
 import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import List, Set
+from itertools import islice
+from typing import Dict, List, Set, Tuple
+
+from . import _astcache
+
+# Static-pattern tokens and the finding each one maps to. Several tokens
+# share one finding; output stays in this canonical order.
+_STATIC_PATTERNS = (
+    ("subprocess.popen", "Potential dangerous subprocess execution."),
+    ("os.system", "Potential dangerous subprocess execution."),
+    ("aws_secret_access_key", "Possible hard-coded credential detected."),
+    ("api_key", "Possible hard-coded credential detected."),
+    ("eval(", "Dynamic eval/exec usage spotted."),
+    ("exec(", "Dynamic eval/exec usage spotted."),
+)
+_STATIC_FINDINGS = (
+    "Potential dangerous subprocess execution.",
+    "Possible hard-coded credential detected.",
+    "Dynamic eval/exec usage spotted.",
+)
+
+try:  # Optional accelerator: one pass over the blob instead of one per token.
+    import ahocorasick
+
+    _STATIC_AUTOMATON = ahocorasick.Automaton()
+    for _pattern, _message in _STATIC_PATTERNS:
+        _STATIC_AUTOMATON.add_word(_pattern, _message)
+    _STATIC_AUTOMATON.make_automaton()
+except ImportError:
+    _STATIC_AUTOMATON = None
 
 PROTOCOL_HEADERS = {
     "websocket": "The target hosts WebSocket/socket.io handlers. Use `websocket-client` or `socketio.Client` to connect and emit crafted events.",
@@ -12,6 +44,187 @@ PROTOCOL_HEADERS = {
     "static": "Static analysis flagged high-risk patterns (hard-coded secrets, dangerous subprocess usage).",
 }
 
+# Protocols whose evidence comes from the shared AST pass over root_dir.
+_AST_PROTOCOLS = ("websocket", "grpc", "cli", "graphql", "raw_tcp")
+_PROTOCOL_IDS = {name: idx for idx, name in enumerate(_AST_PROTOCOLS)}
+
+# Below this many files the process-pool startup cost exceeds the win.
+_PARALLEL_MIN_FILES = 32
+
+# Cheap bytes-level screens: a file that never mentions any indicator token
+# cannot produce a hit, so it is skipped before the (far costlier) parse.
+# Per-protocol patterns additionally let the tree walk skip handlers whose
+# tokens do not occur in this file at all.
+_PROTOCOL_PREFILTERS = {
+    "websocket": re.compile(rb"socketio", re.IGNORECASE),
+    "grpc": re.compile(rb"grpc|\binsecure_channel\b|\bsecure_channel\b", re.IGNORECASE),
+    "cli": re.compile(rb"argparse|click|typer|add_argument|\bcommand\b|\boption\b", re.IGNORECASE),
+    "graphql": re.compile(rb"graphql|graphene|execute_async", re.IGNORECASE),
+    "raw_tcp": re.compile(rb"\bsocket\b|\bbind\b|\blisten\b", re.IGNORECASE),
+}
+_PREFILTER = re.compile(
+    b"|".join(pattern.pattern for pattern in _PROTOCOL_PREFILTERS.values()),
+    re.IGNORECASE,
+)
+
+
+# Hoisted call-name sets: frozenset membership beats rebuilding a set
+# literal on every node, and the names double as documentation. Members are
+# interned so membership tests on parser-interned attribute names resolve
+# with pointer comparisons.
+_GRPC_CALLS = frozenset(map(sys.intern, ("server", "insecure_channel", "secure_channel")))
+_CLI_CALLS = frozenset(map(sys.intern, ("add_argument", "command", "option")))
+_GRAPHQL_CALLS = frozenset(map(sys.intern, ("grapheneobjecttype", "graphqlview", "execute_async")))
+_TCP_CALLS = frozenset(map(sys.intern, ("socket", "bind", "listen")))
+_ALL_CALL_NAMES = _GRPC_CALLS | _CLI_CALLS | _GRAPHQL_CALLS | _TCP_CALLS | {sys.intern("socketio")}
+_CLI_MODULES = ("argparse", "click", "typer")
+
+
+# Only the first two details per (file, protocol) survive the merge, so the
+# visitor can stop descending once every active protocol has that many.
+_DETAILS_PER_FILE = 2
+
+
+def _call_name(node):
+    """Probed lower-case name of a call's attribute target, or "".
+
+    Attribute names are usually already lowercase, so the common case is a
+    direct membership hit on the interned sets; .lower() (a fresh string per
+    node) only runs for names that miss on the first test.
+    """
+    func = node.func
+    if type(func) is not ast.Attribute:
+        return ""
+    attr = func.attr
+    if attr in _ALL_CALL_NAMES:
+        return attr
+    lowered = attr.lower()
+    return lowered if lowered in _ALL_CALL_NAMES else ""
+
+
+class _Indicators(ast.NodeVisitor):
+    """Single-pass visitor probing every protocol interested in a node type.
+
+    Method dispatch through NodeVisitor avoids per-node lambda/closure
+    allocation, and generic_visit stops descending into subtrees once every
+    active protocol already has as many details as the merge will keep.
+    """
+
+    def __init__(self, path, active):
+        self.path = path
+        self.active = active
+        self.hits: Dict[str, List[str]] = {}
+        self._done = False
+
+    def _record(self, protocol, detail):
+        bucket = self.hits.setdefault(protocol, [])
+        if len(bucket) < _DETAILS_PER_FILE:
+            bucket.append(detail)
+            if len(bucket) == _DETAILS_PER_FILE:
+                hits = self.hits
+                self._done = all(
+                    len(hits.get(name, ())) >= _DETAILS_PER_FILE
+                    for name in self.active
+                )
+
+    def generic_visit(self, node):
+        if not self._done:
+            super().generic_visit(node)
+
+    def visit_ImportFrom(self, node):
+        module = node.module
+        if not module:
+            return
+        lowered = module.lower()
+        active = self.active
+        path = self.path
+        lineno = getattr(node, "lineno", "?")
+        if "websocket" in active and "socketio" in lowered:
+            self._record("websocket", f"Import from {module} ({path}:{lineno}).")
+        if "grpc" in active and "grpc" in lowered:
+            self._record("grpc", f"Import from {module} ({path}:{lineno}).")
+        if "cli" in active and any(mod in lowered for mod in _CLI_MODULES):
+            self._record("cli", f"CLI module import: {module} ({path}:{lineno}).")
+        if "graphql" in active and "graphql" in lowered:
+            self._record("graphql", f"GraphQL import: {module} ({path}:{lineno}).")
+
+    def visit_Call(self, node):
+        func_name = _call_name(node)
+        if func_name:
+            active = self.active
+            path = self.path
+            lineno = getattr(node, "lineno", "?")
+            if "grpc" in active and func_name in _GRPC_CALLS:
+                self._record("grpc", f"gRPC call detected: {func_name} ({path}:{lineno}).")
+            if "cli" in active and func_name in _CLI_CALLS:
+                self._record("cli", f"CLI handler call: {func_name} ({path}:{lineno}).")
+            if "graphql" in active and func_name in _GRAPHQL_CALLS:
+                self._record("graphql", f"GraphQL handler call: {func_name} ({path}:{lineno}).")
+            if "raw_tcp" in active and func_name in _TCP_CALLS:
+                self._record("raw_tcp", f"Raw socket handling detected ({path}:{lineno}).")
+        self.generic_visit(node)
+
+    def visit_Assign(self, node):
+        if "websocket" in self.active:
+            value = node.value
+            if type(value) is ast.Call and _call_name(value) == "socketio":
+                self._record(
+                    "websocket",
+                    f"SocketIO initialization detected in {self.path}:{getattr(node, 'lineno', '?')}.",
+                )
+        self.generic_visit(node)
+
+
+def _iter_py_files(root_dir):
+    """Yield .py file paths under root_dir via an explicit scandir stack.
+
+    Filters on entry.name straight from the DirEntry, so no per-entry stat
+    or path join happens for files we do not care about, unlike os.walk
+    which materializes name lists for every directory.
+    """
+    stack = [root_dir]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = os.scandir(current)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(".py"):
+                    yield entry.path
+
+
+def _scan_file(path):
+    """Parse one file and run all indicator handlers in a single tree walk.
+
+    Files that contain none of the indicator tokens are rejected by a bytes
+    regex scan before the parse, which is orders of magnitude cheaper than
+    ast.parse on the typical file that references none of the probed APIs.
+    """
+    try:
+        with open(path, "rb") as handle:
+            src = handle.read()
+    except OSError:
+        return None
+    if not _PREFILTER.search(src):
+        return None
+    active = frozenset(
+        name
+        for name, pattern in _PROTOCOL_PREFILTERS.items()
+        if pattern.search(src)
+    )
+    try:
+        tree = _astcache.load_tree(path, src=src)
+    except (OSError, SyntaxError, ValueError):
+        return None
+    visitor = _Indicators(path, active)
+    visitor.visit(tree)
+    return visitor.hits
+
+
 @dataclass
 class ProtocolEvidence:
     name: str
@@ -31,9 +244,15 @@ class ProtocolAdvisor:
 
     def gather(self, diff_text: str, context_text: str) -> List[ProtocolEvidence]:
         root = self._extract_root_from_context(context_text) or self._guess_root_from_diff(diff_text)
+        text_blob = diff_text + "\n" + context_text
+        # One directory traversal and one shared pass over root_dir; each
+        # detector just reads its slice of the result.
+        paths = list(_iter_py_files(root)) if root else []
+        file_pool, flat_hits = self._scan_root(paths)
+        scan = self._materialize(file_pool, flat_hits)
         evidences = []
         for name, detector in self.detectors:
-            evidence = detector(root, diff_text + "\n" + context_text)
+            evidence = detector(root, text_blob, scan)
             if evidence.files or evidence.details:
                 evidences.append(evidence)
         return evidences
@@ -43,12 +262,17 @@ class ProtocolAdvisor:
         if not evidences:
             return ""
 
-        lines = ["Detected protocol indicators:"]
+        # Flat fragments joined once: no per-line f-string formatting and no
+        # details[:3] slice copy per evidence.
+        parts = ["Detected protocol indicators:"]
+        append = parts.append
         for evidence in evidences:
-            lines.append(f"- {PROTOCOL_HEADERS[evidence.name]}")
-            for detail in evidence.details[:3]:
-                lines.append(f"  * {detail}")
-        return "\n".join(lines)
+            append("\n- ")
+            append(PROTOCOL_HEADERS[evidence.name])
+            for detail in islice(evidence.details, 3):
+                append("\n  * ")
+                append(detail)
+        return "".join(parts)
 
     def _extract_root_from_context(self, context_text: str):
         # Context text contains absolute file paths in definitions; use path up to "deepreview"
@@ -72,18 +296,72 @@ class ProtocolAdvisor:
                     return os.path.dirname(candidate)
         return None
 
-    def _detect_websocket(self, root_dir, text_blob) -> ProtocolEvidence:
-        files, details = self._search_ast(root_dir, self._websocket_indicator)
+    def _scan_root(self, paths) -> Tuple[List[str], List[Tuple[int, int, str]]]:
+        """Parse and visit each listed .py file a single time.
+
+        Hits accumulate structure-of-arrays style: an interned file pool plus
+        one flat (protocol_id, file_idx, detail) list, instead of a set and a
+        list allocated per protocol. The flat records are materialized into
+        ProtocolEvidence-shaped slices only once scanning is done.
+
+        Parsing and walking are CPU-bound and independent per file, so large
+        file sets are fanned out to a process pool; small ones stay serial
+        because pool startup would cost more than it saves.
+        """
+        file_pool: List[str] = []
+        flat_hits: List[Tuple[int, int, str]] = []
+        if not paths:
+            return file_pool, flat_hits
+        if len(paths) >= _PARALLEL_MIN_FILES:
+            workers = os.cpu_count() or 1
+            chunksize = max(1, len(paths) // (workers * 4))
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    per_file = executor.map(_scan_file, paths, chunksize=chunksize)
+                    self._merge_scan(file_pool, flat_hits, paths, per_file)
+                return file_pool, flat_hits
+            except Exception:
+                # e.g. pools unavailable in the host environment; fall through
+                # to the serial scan.
+                pass
+        self._merge_scan(file_pool, flat_hits, paths, map(_scan_file, paths))
+        return file_pool, flat_hits
+
+    @staticmethod
+    def _merge_scan(file_pool, flat_hits, paths, per_file) -> None:
+        for path, hits in zip(paths, per_file):
+            if not hits:
+                continue
+            file_idx = len(file_pool)
+            file_pool.append(sys.intern(path))
+            for protocol, details in hits.items():
+                protocol_id = _PROTOCOL_IDS[protocol]
+                for detail in details[:_DETAILS_PER_FILE]:
+                    flat_hits.append((protocol_id, file_idx, detail))
+
+    @staticmethod
+    def _materialize(file_pool, flat_hits) -> Dict[str, Tuple[Set[str], List[str]]]:
+        scan: Dict[str, Tuple[Set[str], List[str]]] = {
+            name: (set(), []) for name in _AST_PROTOCOLS
+        }
+        for protocol_id, file_idx, detail in flat_hits:
+            files, details = scan[_AST_PROTOCOLS[protocol_id]]
+            files.add(file_pool[file_idx])
+            details.append(detail)
+        return scan
+
+    def _detect_websocket(self, root_dir, text_blob, scan) -> ProtocolEvidence:
+        files, details = scan["websocket"]
         if not files and "socketio" in text_blob.lower():
             details.append("SocketIO reference in diff/context.")
         return ProtocolEvidence("websocket", files, details)
 
-    def _detect_grpc(self, root_dir, text_blob) -> ProtocolEvidence:
-        files, details = self._search_ast(root_dir, self._grpc_indicator)
+    def _detect_grpc(self, root_dir, text_blob, scan) -> ProtocolEvidence:
+        files, details = scan["grpc"]
         return ProtocolEvidence("grpc", files, details)
 
-    def _detect_cli(self, root_dir, text_blob) -> ProtocolEvidence:
-        files, details = self._search_ast(root_dir, self._cli_indicator)
+    def _detect_cli(self, root_dir, text_blob, scan) -> ProtocolEvidence:
+        files, details = scan["cli"]
         return ProtocolEvidence("cli", files, details)
 
     def runtime_hint(self, port: int) -> str:
@@ -93,100 +371,32 @@ class ProtocolAdvisor:
             return f"Runtime health check shows port {port} open; consider probing raw TCP protocols."
         return ""
 
-    def _search_ast(self, root_dir, indicator, capture_snippet=False):
-        files = set()
-        details = []
-        if not root_dir:
-            return files, details
-        for dirpath, _, filenames in os.walk(root_dir):
-            for filename in filenames:
-                if not filename.endswith(".py"):
-                    continue
-                path = os.path.join(dirpath, filename)
-                try:
-                    src = open(path, "r", encoding="utf-8").read()
-                    tree = ast.parse(src, filename=path)
-                    hint = indicator(tree, path, src if capture_snippet else None)
-                    if hint:
-                        files.add(path)
-                        details.extend(hint[:2])
-                except (OSError, SyntaxError):
-                    continue
-        return files, details
-
-    def _websocket_indicator(self, tree, path):
-        indicators = []
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Assign):
-                if isinstance(node.value, ast.Call) and getattr(getattr(node.value.func, "attr", None), "lower", lambda: "")() == "socketio":
-                    indicators.append(f"SocketIO initialization detected in {path}:{getattr(node, 'lineno', '?')}.")
-            if isinstance(node, ast.ImportFrom):
-                if node.module and "socketio" in node.module.lower():
-                    indicators.append(f"Import from {node.module} ({path}:{getattr(node, 'lineno', '?')}).")
-        return indicators
-
-    def _grpc_indicator(self, tree, path):
-        indicators = []
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ImportFrom):
-                if node.module and "grpc" in node.module.lower():
-                    indicators.append(f"Import from {node.module} ({path}:{getattr(node, 'lineno', '?')}).")
-            if isinstance(node, ast.Call):
-                func_name = getattr(getattr(node.func, "attr", None), "lower", lambda: "")()
-                if func_name in {"server", "insecure_channel", "secure_channel"}:
-                    indicators.append(f"gRPC call detected: {func_name} ({path}:{getattr(node, 'lineno', '?')}).")
-        return indicators
-
-    def _cli_indicator(self, tree, path):
-        indicators = []
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ImportFrom) and node.module and any(mod in node.module.lower() for mod in ("argparse", "click", "typer")):
-                indicators.append(f"CLI module import: {node.module} ({path}:{getattr(node, 'lineno', '?')}).")
-            if isinstance(node, ast.Call):
-                func_name = getattr(getattr(node.func, "attr", None), "lower", lambda: "")()
-                if func_name in {"add_argument", "command", "option"}:
-                    indicators.append(f"CLI handler call: {func_name} ({path}:{getattr(node, 'lineno', '?')}).")
-        return indicators
-
-    def _detect_graphql(self, root_dir, text_blob):
-        files, details = self._search_ast(root_dir, self._graphql_indicator)
+    def _detect_graphql(self, root_dir, text_blob, scan):
+        files, details = scan["graphql"]
         if not files and "graphql" in text_blob.lower():
             details.append("GraphQL reference in diff/context.")
         return ProtocolEvidence("graphql", files, details)
 
-    def _detect_raw_tcp(self, root_dir, text_blob):
-        files, details = self._search_ast(root_dir, self._raw_tcp_indicator)
+    def _detect_raw_tcp(self, root_dir, text_blob, scan):
+        files, details = scan["raw_tcp"]
         if not files and "socket.socket" in text_blob.lower():
             details.append("Socket usage reference in diff/context.")
         return ProtocolEvidence("raw_tcp", files, details)
 
-    def _detect_static_issues(self, root_dir, text_blob):
+    def _detect_static_issues(self, root_dir, text_blob, scan):
         issues = self._scan_static_patterns(text_blob, root_dir)
         return ProtocolEvidence("static", set(), issues)
 
-    def _graphql_indicator(self, tree, path):
-        indicators = []
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ImportFrom) and node.module and "graphql" in node.module.lower():
-                indicators.append(f"GraphQL import: {node.module} ({path}:{getattr(node, 'lineno', '?')}).")
-            if isinstance(node, ast.Call):
-                func_name = getattr(getattr(node.func, "attr", None), "lower", lambda: "")()
-                if func_name in {"grapheneobjecttype", "graphqlview", "execute_async"}:
-                    indicators.append(f"GraphQL handler call: {func_name} ({path}:{getattr(node, 'lineno', '?')}).")
-        return indicators
-
-    def _raw_tcp_indicator(self, tree, path):
-        indicators = []
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Call):
-                func_name = getattr(getattr(node.func, "attr", None), "lower", lambda: "")()
-                if func_name in {"socket", "bind", "listen"}:
-                    indicators.append(f"Raw socket handling detected ({path}:{getattr(node, 'lineno', '?')}).")
-        return indicators
-
     def _scan_static_patterns(self, text_blob: str, root_dir: str):
-        findings = []
         lowered = text_blob.lower()
+        if _STATIC_AUTOMATON is not None:
+            matched = set()
+            for _, message in _STATIC_AUTOMATON.iter(lowered):
+                matched.add(message)
+                if len(matched) == len(_STATIC_FINDINGS):
+                    break
+            return [finding for finding in _STATIC_FINDINGS if finding in matched]
+        findings = []
         if "subprocess.popen" in lowered or "os.system" in lowered:
             findings.append("Potential dangerous subprocess execution.")
         if "aws_secret_access_key" in lowered or "api_key" in lowered:
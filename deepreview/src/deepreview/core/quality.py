@@ -2,11 +2,18 @@
 import os
 import shutil
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Sequence
+from typing import Any, Dict, List, Optional, Sequence
 
 from ..config import Config
 
+try:  # Optional accelerator: ~2-3x faster than stdlib json on big outputs.
+    import orjson
+except ImportError:
+    orjson = None
+
 RUFF_SEVERITY_BY_PREFIX = {
     "e": "low",
     "f": "low",
@@ -18,27 +25,50 @@ RUFF_SEVERITY_BY_PREFIX = {
 }
 
 
-def _run_command(cmd: List[str], cwd: str) -> str | None:
-    if not shutil.which(cmd[0]):
+@lru_cache(maxsize=16)
+def _which(exe: str) -> str | None:
+    # shutil.which stats every $PATH candidate; tool locations do not change
+    # within a run, so look each executable up once.
+    return shutil.which(exe)
+
+
+def _run_command(cmd: List[str], cwd: str) -> bytes | None:
+    if not _which(cmd[0]):
         return None
     try:
-        result = subprocess.run(
+        # Keep stdout as bytes: the JSON parsers accept bytes directly, so a
+        # decode pass over megabytes of tool output would be pure overhead,
+        # and stderr is discarded at the fd level. communicate() bounds the
+        # whole interaction with the timeout — a plain stdout.read() would
+        # block with no deadline if the tool hangs while holding the pipe.
+        proc = subprocess.Popen(
             cmd,
             cwd=cwd,
-            capture_output=True,
-            text=True,
-            timeout=120,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
         )
-        return result.stdout
+        try:
+            output, _ = proc.communicate(timeout=120)
+        except Exception:
+            proc.kill()
+            proc.wait()
+            raise
+        return output
     except Exception:
         return None
 
 
+def _json_loads(data: bytes):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 def run_ruff(
     target_path: str,
     base_path: str,
     include_paths: Optional[Sequence[str]] = None,
-) -> List[Dict[str, str]]:
+) -> List[Dict[str, Any]]:
     targets = _normalize_targets(target_path, include_paths)
     cmd = ["ruff", "check", "--exit-zero", "--output-format", "json"]
     if getattr(Config, "RUFF_ISOLATED", False):
@@ -51,11 +81,11 @@ def run_ruff(
     if not output:
         return []
     try:
-        data = json.loads(output)
-    except json.JSONDecodeError:
+        data = _json_loads(output)
+    except ValueError:
         return []
 
-    findings: List[Dict[str, str]] = []
+    findings: List[Dict[str, Any]] = []
     for entry in data:
         rel_file = _relpath(entry.get("filename"), base_path)
         code = entry.get("code")
@@ -76,7 +106,7 @@ def run_bandit(
     target_path: str,
     base_path: str,
     include_paths: Optional[Sequence[str]] = None,
-) -> List[Dict[str, str]]:
+) -> List[Dict[str, Any]]:
     targets = _normalize_targets(target_path, include_paths)
     cmd = ["bandit", "-f", "json", "-q", "--exit-zero"]
     skip = (getattr(Config, "BANDIT_SKIP", "") or "").strip()
@@ -93,11 +123,11 @@ def run_bandit(
     if not output:
         return []
     try:
-        data = json.loads(output)
-    except json.JSONDecodeError:
+        data = _json_loads(output)
+    except ValueError:
         return []
 
-    findings: List[Dict[str, str]] = []
+    findings: List[Dict[str, Any]] = []
     for result in data.get("results", []):
         rel_file = _relpath(result.get("filename"), base_path)
         severity = (result.get("issue_severity") or "info").lower()
@@ -117,10 +147,18 @@ def run_bandit(
 def collect_quality_findings(
     target_path: str,
     include_paths: Optional[Sequence[str]] = None,
-) -> List[Dict[str, str]]:
-    findings: List[Dict[str, str]] = []
-    findings.extend(run_ruff(target_path, target_path, include_paths=include_paths))
-    findings.extend(run_bandit(target_path, target_path, include_paths=include_paths))
+) -> List[Dict[str, Any]]:
+    # ruff and bandit are independent external processes; run them side by
+    # side so the quality pass costs max(ruff, bandit) instead of the sum.
+    # Threads suffice — the Python side just waits on subprocess pipes.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        ruff_future = executor.submit(
+            run_ruff, target_path, target_path, include_paths=include_paths
+        )
+        bandit_future = executor.submit(
+            run_bandit, target_path, target_path, include_paths=include_paths
+        )
+        findings = ruff_future.result() + bandit_future.result()
     return _deduplicate(findings)
 
 
@@ -131,19 +169,25 @@ def _ruff_severity(code: str | None) -> str:
     return level or "info"
 
 
-def _deduplicate(findings: List[Dict[str, str]]) -> List[Dict[str, str]]:
-    unique: dict[tuple[str | None, str | None, int | None, str | None, str | None], Dict[str, str]] = {}
+def _deduplicate(findings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Seen-set plus append keeps first-occurrence order without paying for
+    # dict slots and a values() copy. run_ruff/run_bandit always populate
+    # these keys, so direct indexing is safe (and faster than .get).
+    seen: set = set()
+    unique: List[Dict[str, Any]] = []
     for item in findings:
         key = (
-            item.get("tool"),
-            item.get("file"),
-            item.get("line"),
-            item.get("code"),
-            item.get("message"),
+            item["tool"],
+            item["file"],
+            item["line"],
+            item["code"],
+            item["message"],
         )
-        if key not in unique:
-            unique[key] = item
-    return list(unique.values())
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append(item)
+    return unique
 
 
 def _relpath(path: str | None, base: str) -> str | None:
@@ -1,3 +1,4 @@
+import io
 import json
 import os
 from datetime import datetime, timezone
@@ -7,8 +8,18 @@ def write_report(report_path: str, payload: dict):
     Persists the structured report to disk with ISO timestamp metadata.
     """
     os.makedirs(os.path.dirname(os.path.abspath(report_path)) or ".", exist_ok=True)
-    enriched = dict(payload)
-    enriched.setdefault("generated_at", datetime.now(timezone.utc).isoformat())
-    with open(report_path, "w", encoding="utf-8") as handle:
-        json.dump(enriched, handle, indent=2, ensure_ascii=False)
+    # Only copy when we actually add the timestamp (setdefault would also
+    # format the time eagerly even when the key is already present).
+    if "generated_at" in payload:
+        enriched = payload
+    else:
+        enriched = dict(payload)
+        enriched["generated_at"] = datetime.now(timezone.utc).isoformat()
+    # Stream straight into the file: json.dump writes incrementally through
+    # the wrapper instead of allocating the whole document as one string.
+    with open(report_path, "wb") as handle:
+        wrapper = io.TextIOWrapper(handle, encoding="utf-8", write_through=True)
+        json.dump(enriched, wrapper, indent=2, ensure_ascii=False)
+        wrapper.flush()
+        wrapper.detach()
     print(f"[Report] Saved to {report_path}")
@@ -1,12 +1,23 @@
 ﻿from __future__ import annotations
 
+import io
 import json
 import re
+import string
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
+try:  # orjson's C encoder skips the intermediate Python string entirely.
+    import orjson
+except ImportError:
+    orjson = None
 
+
+# Reports reuse a handful of severity strings thousands of times; caching
+# skips the lower() + set probes for every repeat.
+@lru_cache(maxsize=16)
 def _map_severity(level: str | None) -> str:
     normalized = (level or "").lower()
     if normalized in {"critical", "high"}:
@@ -17,87 +28,123 @@ def _map_severity(level: str | None) -> str:
 
 
 def _build_location(finding: dict[str, Any], target_uri: str) -> dict[str, Any]:
+    # Built in one literal per shape instead of mutating a shared template:
+    # most findings carry no line number and skip the region dict entirely.
     uri = finding.get("file") or target_uri
-    location: dict[str, Any] = {
+    line = finding.get("line")
+    if isinstance(line, int) and line > 0:
+        return {
+            "physicalLocation": {
+                "artifactLocation": {"uri": uri},
+                "region": {"startLine": line},
+            }
+        }
+    return {
         "physicalLocation": {
             "artifactLocation": {"uri": uri},
         }
     }
-    line = finding.get("line")
-    if isinstance(line, int) and line > 0:
-        location["physicalLocation"]["region"] = {"startLine": line}
-    return location
+
+
+# Compiled once: _slugify runs per rule/title, and re.sub would pay the
+# pattern-cache lookup on every call.
+_SLUG_RE = re.compile(r"[^a-zA-Z0-9._-]+")
+# ASCII fast path: C-level translate maps each disallowed char to a NUL
+# sentinel, and a trivial "\0+" collapse reproduces the regex's run
+# semantics without touching literal dashes in the input.
+_SLUG_ALLOWED = frozenset(string.ascii_letters + string.digits + "._-")
+_SLUG_TRANS = str.maketrans(
+    {c: "\0" for c in map(chr, range(128)) if c not in _SLUG_ALLOWED}
+)
+_NUL_RUN_RE = re.compile("\0+")
 
 
 def _slugify(text: str) -> str:
-    cleaned = re.sub(r"[^a-zA-Z0-9._-]+", "-", (text or "").strip()).strip("-").lower()
+    text = (text or "").strip()
+    if text.isascii():
+        cleaned = _NUL_RUN_RE.sub("-", text.translate(_SLUG_TRANS)).strip("-").lower()
+    else:
+        cleaned = _SLUG_RE.sub("-", text).strip("-").lower()
     return cleaned or "rule"
 
 
-def _build_llm_result(idx: int, finding: dict[str, Any], target_uri: str) -> dict[str, Any]:
-    title = finding.get("title") or f"LLM Finding #{idx}"
-    description = finding.get("description") or title
-    recommendation = finding.get("recommendation")
+def _build_llm_result(idx: int, finding: dict[str, Any], target_uri: str) -> tuple[dict[str, Any], str, str]:
+    # Destructure once up front: each .get is a method call plus a hash, and
+    # severity/title would otherwise be looked up twice per finding.
+    get = finding.get
+    title = get("title") or f"LLM Finding #{idx}"
+    description = get("description") or title
+    recommendation = get("recommendation")
+    severity = get("severity")
     message_lines = [description]
     if recommendation:
         message_lines.append(f"Recommendation: {recommendation}")
     message = "\n".join(message_lines)
-    return {
+    result = {
         "ruleId": "deepreview-llm",
-        "level": _map_severity(finding.get("severity")),
+        "level": _map_severity(severity),
         "message": {"text": message},
         "properties": {
             "title": title,
-            "severity": finding.get("severity"),
-            "confidence": finding.get("confidence"),
+            "severity": severity,
+            "confidence": get("confidence"),
         },
         "locations": [_build_location(finding, target_uri)],
     }
+    return result, "deepreview-llm", title
 
 
-def _build_quality_result(idx: int, finding: dict[str, Any], target_uri: str) -> dict[str, Any]:
-    tool = finding.get("tool") or "quality"
-    code = finding.get("code") or "check"
+def _build_quality_result(idx: int, finding: dict[str, Any], target_uri: str) -> tuple[dict[str, Any], str, str]:
+    get = finding.get
+    raw_tool = get("tool")
+    raw_code = get("code")
+    severity = get("severity")
+    tool = raw_tool or "quality"
+    code = raw_code or "check"
     rule_id = f"deepreview-{_slugify(str(tool))}-{_slugify(str(code))}"
     title = f"{tool}:{code}"
-    message = finding.get("message") or title
-    return {
+    message = get("message") or title
+    result = {
         "ruleId": rule_id,
-        "level": _map_severity(finding.get("severity")),
+        "level": _map_severity(severity),
         "message": {"text": message},
         "properties": {
             "title": title,
-            "severity": finding.get("severity"),
-            "tool": finding.get("tool"),
-            "code": finding.get("code"),
+            "severity": severity,
+            "tool": raw_tool,
+            "code": raw_code,
         },
         "locations": [_build_location(finding, target_uri)],
     }
+    return result, rule_id, title
 
 
-def _build_heuristic_result(idx: int, finding: dict[str, Any], target_uri: str) -> dict[str, Any]:
-    title = finding.get("title") or f"Heuristic Finding #{idx}"
-    rule_key = finding.get("rule_id") or title
+def _build_heuristic_result(idx: int, finding: dict[str, Any], target_uri: str) -> tuple[dict[str, Any], str, str]:
+    get = finding.get
+    title = get("title") or f"Heuristic Finding #{idx}"
+    rule_key = get("rule_id") or title
     rule_id = f"deepreview-heuristic-{_slugify(str(rule_key))}"
-    description = finding.get("description") or title
-    evidence = finding.get("evidence")
-    recommendation = finding.get("recommendation")
+    description = get("description") or title
+    evidence = get("evidence")
+    recommendation = get("recommendation")
+    severity = get("severity")
     message_parts = [description]
     if evidence:
         message_parts.append(f"Evidence: {evidence}")
     if recommendation:
         message_parts.append(f"Recommendation: {recommendation}")
-    return {
+    result = {
         "ruleId": rule_id,
-        "level": _map_severity(finding.get("severity")),
+        "level": _map_severity(severity),
         "message": {"text": "\n".join(message_parts)},
         "properties": {
             "title": title,
-            "severity": finding.get("severity"),
+            "severity": severity,
             "source": "heuristic",
         },
         "locations": [_build_location(finding, target_uri)],
     }
+    return result, rule_id, title
 
 
 def write_sarif(report_data: dict[str, Any], sarif_path: str) -> None:
@@ -115,30 +162,38 @@ def write_sarif(report_data: dict[str, Any], sarif_path: str) -> None:
         "attempts": metadata.get("reproduction_count", 0)
     }
 
+    # Build results and their rules in one pass; bound methods are hoisted
+    # out of the hot loop, and the running idx reproduces the offset-based
+    # numbering the three separate loops used to compute. A clean run (no
+    # findings at all) skips the loop machinery entirely.
     results: list[dict[str, Any]] = []
-    for idx, finding in enumerate(llm_findings, start=1):
-        results.append(_build_llm_result(idx, finding, target_uri))
-    quality_offset = len(results)
-    for idx, finding in enumerate(quality_findings, start=1):
-        results.append(_build_quality_result(quality_offset + idx, finding, target_uri))
-    heuristic_offset = len(results)
-    for idx, finding in enumerate(heuristic_findings, start=1):
-        results.append(_build_heuristic_result(heuristic_offset + idx, finding, target_uri))
-
-    rules_by_id: dict[str, dict[str, Any]] = {}
-    for result in results:
-        rule_id = result.get("ruleId")
-        if not rule_id:
-            continue
-        title = (result.get("properties") or {}).get("title") or rule_id
-        if rule_id in rules_by_id:
-            continue
-        rules_by_id[rule_id] = {
-            "id": rule_id,
-            "name": title,
-            "shortDescription": {"text": title},
-        }
-    rules = list(rules_by_id.values())
+    rules: list[dict[str, Any]] = []
+    if llm_findings or quality_findings or heuristic_findings:
+        seen_rules: set[str] = set()
+        results_append = results.append
+        rules_append = rules.append
+        seen_add = seen_rules.add
+
+        idx = 0
+        for builder, findings in (
+            (_build_llm_result, llm_findings),
+            (_build_quality_result, quality_findings),
+            (_build_heuristic_result, heuristic_findings),
+        ):
+            for finding in findings:
+                idx += 1
+                result, rule_id, title = builder(idx, finding, target_uri)
+                results_append(result)
+                if rule_id in seen_rules:
+                    continue
+                seen_add(rule_id)
+                rules_append(
+                    {
+                        "id": rule_id,
+                        "name": title,
+                        "shortDescription": {"text": title},
+                    }
+                )
 
     sarif_doc = {
         "version": "2.1.0",
@@ -174,4 +229,15 @@ def write_sarif(report_data: dict[str, Any], sarif_path: str) -> None:
 
     sarif_file = Path(sarif_path)
     sarif_file.parent.mkdir(parents=True, exist_ok=True)
-    sarif_file.write_text(json.dumps(sarif_doc, indent=2), encoding="utf-8")
+    # Write bytes directly (orjson) or stream through a text wrapper so the
+    # full document never exists as one in-memory string. The 1 MiB buffer
+    # batches json.dump's many small writes into few syscalls, and
+    # ensure_ascii=False skips the \uXXXX escape loop over every character.
+    with open(sarif_file, "wb", buffering=1 << 20) as handle:
+        if orjson is not None:
+            handle.write(orjson.dumps(sarif_doc, option=orjson.OPT_INDENT_2))
+        else:
+            wrapper = io.TextIOWrapper(handle, encoding="utf-8", write_through=True)
+            json.dump(sarif_doc, wrapper, indent=2, ensure_ascii=False)
+            wrapper.flush()
+            wrapper.detach()
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
@@ -23,13 +23,18 @@ class AutomationState:
     start_time: str = field(default_factory=_utcnow)
     last_updated: str = field(default_factory=_utcnow)
 
-    def increment_iteration(self) -> None:
+    def _touch(self, ts: Optional[str] = None) -> None:
+        # Callers making several transitions back-to-back pass one shared
+        # timestamp instead of building a fresh datetime per mutation.
+        self.last_updated = ts or _utcnow()
+
+    def increment_iteration(self, ts: Optional[str] = None) -> None:
         self.iteration += 1
-        self.last_updated = _utcnow()
+        self._touch(ts)
 
-    def set_phase(self, phase: str) -> None:
+    def set_phase(self, phase: str, ts: Optional[str] = None) -> None:
         self.phase = phase
-        self.last_updated = _utcnow()
+        self._touch(ts)
 
     def add_action(self, action: Dict[str, Any]) -> None:
         decorated = {
@@ -40,19 +45,29 @@ class AutomationState:
         self.actions.append(decorated)
         self.last_updated = decorated["timestamp"]
 
-    def add_error(self, message: str) -> None:
+    def add_error(self, message: str, ts: Optional[str] = None) -> None:
         self.errors.append(f"[iter={self.iteration}] {message}")
-        self.last_updated = _utcnow()
+        self._touch(ts)
 
-    def set_completed(self) -> None:
+    def set_completed(self, ts: Optional[str] = None) -> None:
         self.completed = True
-        self.last_updated = _utcnow()
+        self._touch(ts)
 
     def snapshot(self) -> Dict[str, Any]:
-        data = asdict(self)
-        data["actions"] = list(self.actions)
-        data["errors"] = list(self.errors)
-        return data
+        # Built by hand: asdict() deep-copies every action dict on each
+        # snapshot, and action entries are write-once so fresh list shells
+        # around the existing dicts are enough isolation.
+        return {
+            "run_name": self.run_name,
+            "max_iterations": self.max_iterations,
+            "phase": self.phase,
+            "iteration": self.iteration,
+            "completed": self.completed,
+            "errors": list(self.errors),
+            "actions": list(self.actions),
+            "start_time": self.start_time,
+            "last_updated": self.last_updated,
+        }
 
 
 class PhaseContext:
@@ -64,12 +79,21 @@ class PhaseContext:
         self.previous_phase: Optional[str] = None
 
     def __enter__(self) -> None:
-        self.previous_phase = self.state.phase
-        self.state.set_phase(self.phase)
-        self.state.increment_iteration()
+        # Inlined transitions: set_phase + increment_iteration would each go
+        # through a method call and _touch for what amounts to three writes.
+        state = self.state
+        self.previous_phase = state.phase
+        state.phase = self.phase
+        state.iteration += 1
+        state.last_updated = _utcnow()
 
     def __exit__(self, exc_type, exc, _tb) -> None:
+        state = self.state
+        ts = None
         if exc:
-            self.state.add_error(f"{self.phase} failed: {exc}")
-        if not self.state.completed and self.previous_phase:
-            self.state.set_phase(self.previous_phase)
+            ts = _utcnow()
+            state.errors.append(f"[iter={state.iteration}] {self.phase} failed: {exc}")
+            state.last_updated = ts
+        if not state.completed and self.previous_phase:
+            state.phase = self.previous_phase
+            state.last_updated = ts or _utcnow()
@@ -2,11 +2,17 @@ from __future__ import annotations
 
 import json
 import shutil
+import time
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Dict, Optional
 from uuid import uuid4
 
+try:  # Optional accelerator: C encoder straight to bytes, 5-10x stdlib.
+    import orjson
+except ImportError:
+    orjson = None
+
 
 if TYPE_CHECKING:
     from .state import AutomationState
@@ -16,6 +22,33 @@ def _utcnow() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+def _dumps_indented(data: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def _dumps_compact(data: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+# Rewriting run.json more often than this buys nothing; the event stream is
+# already durable in the JSONL sidecar.
+_WRITE_INTERVAL_SECONDS = 1.0
+
+# Shared sentinel for events without info: `info or {}` allocated a fresh
+# dict per event. Treated as read-only by convention — a mappingproxy would
+# enforce that but neither json nor orjson can serialize one.
+_EMPTY_INFO: Dict[str, Any] = {}
+
+# Attempt output larger than this goes to side files: everything embedded in
+# self.data gets re-serialized on every run.json rewrite for the rest of the
+# run, so a chatty exploit would make each rewrite cost its whole history.
+_ATTEMPT_SPILL_BYTES = 4096
+
+
 class RunTracer:
     """Persist run metadata/artifacts – inspired by Strix telemetry."""
 
@@ -37,6 +70,13 @@ class RunTracer:
             "artifacts": {},
             "notes": [],
         }
+        self._last_write = 0.0
+        # Append-only sidecar for the event streams: each log call writes one
+        # line instead of re-serializing the whole growing run document.
+        try:
+            self._events_fp = open(self.run_dir / "events.jsonl", "ab", buffering=1 << 16)
+        except OSError:
+            self._events_fp = None
         self._write()
 
     def persist_state(self, state: "AutomationState | Dict[str, Any]") -> None:
@@ -45,15 +85,30 @@ class RunTracer:
         else:
             payload = dict(state)
         try:
-            self._state_file.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+            self._state_file.write_bytes(_dumps_indented(payload))
         except OSError:
             pass
 
-    def _write(self) -> None:
-        self.data["updated_at"] = _utcnow()
-        (self.run_dir / "run.json").write_text(
-            json.dumps(self.data, indent=2), encoding="utf-8"
-        )
+    def _write(self, ts: Optional[str] = None) -> None:
+        # Log methods already stamped their entry; reuse that string rather
+        # than constructing a second tz-aware datetime per call.
+        self.data["updated_at"] = ts or _utcnow()
+        (self.run_dir / "run.json").write_bytes(_dumps_indented(self.data))
+        self._last_write = time.monotonic()
+
+    def _maybe_write(self, ts: Optional[str] = None) -> None:
+        # Debounce: re-serializing the entire run document per event is
+        # O(N^2) bytes over a run; the sidecar already has every entry.
+        if time.monotonic() - self._last_write >= _WRITE_INTERVAL_SECONDS:
+            self._write(ts)
+
+    def _append_line(self, kind: str, entry: Dict[str, Any]) -> None:
+        if self._events_fp is None:
+            return
+        try:
+            self._events_fp.write(_dumps_compact({"kind": kind, **entry}) + b"\n")
+        except OSError:
+            pass
 
     def set_target(self, path: str, analysis_source: str, workspace: Optional[str] = None) -> None:
         self.data["target"] = {
@@ -65,25 +120,28 @@ class RunTracer:
         self._write()
 
     def log_event(self, phase: str, status: str, info: Optional[Dict[str, Any]] = None) -> None:
+        ts = _utcnow()
         entry = {
             "phase": phase,
             "status": status,
-            "info": info or {},
-            "timestamp": _utcnow(),
+            "info": info if info else _EMPTY_INFO,
+            "timestamp": ts,
         }
         self.data["events"].append(entry)
-        self._write()
+        self._append_line("event", entry)
+        self._maybe_write(ts)
 
     def log_llm_message(self, purpose: str, prompt_bytes: int, response_bytes: int) -> None:
-        self.data["llm_messages"].append(
-            {
-                "purpose": purpose,
-                "prompt_bytes": prompt_bytes,
-                "response_bytes": response_bytes,
-                "timestamp": _utcnow(),
-            }
-        )
-        self._write()
+        ts = _utcnow()
+        entry = {
+            "purpose": purpose,
+            "prompt_bytes": prompt_bytes,
+            "response_bytes": response_bytes,
+            "timestamp": ts,
+        }
+        self.data["llm_messages"].append(entry)
+        self._append_line("llm_message", entry)
+        self._maybe_write(ts)
 
     def log_attempt(
         self,
@@ -92,19 +150,36 @@ class RunTracer:
         stderr: str,
         success: bool,
     ) -> None:
+        ts = _utcnow()
         record = {
             "iteration": iteration,
-            "stdout": stdout,
-            "stderr": stderr,
             "success": success,
-            "timestamp": _utcnow(),
+            "timestamp": ts,
         }
+        if len(stdout) + len(stderr) > _ATTEMPT_SPILL_BYTES:
+            stdout_path = self.run_dir / f"attempt-{iteration:04d}.stdout.txt"
+            stderr_path = self.run_dir / f"attempt-{iteration:04d}.stderr.txt"
+            try:
+                stdout_path.write_text(stdout, encoding="utf-8")
+                stderr_path.write_text(stderr, encoding="utf-8")
+                record["stdout_path"] = str(stdout_path)
+                record["stderr_path"] = str(stderr_path)
+            except OSError:
+                record["stdout"] = stdout
+                record["stderr"] = stderr
+        else:
+            record["stdout"] = stdout
+            record["stderr"] = stderr
         self.data["attempts"].append(record)
-        self._write()
+        self._append_line("attempt", record)
+        self._maybe_write(ts)
 
     def add_note(self, text: str) -> None:
-        self.data["notes"].append({"text": text, "timestamp": _utcnow()})
-        self._write()
+        ts = _utcnow()
+        entry = {"text": text, "timestamp": ts}
+        self.data["notes"].append(entry)
+        self._append_line("note", entry)
+        self._maybe_write(ts)
 
     def record_artifact(self, name: str, path: Path) -> None:
         if path.exists():
@@ -115,13 +190,18 @@ class RunTracer:
                 except OSError:
                     dest.write_text(path.read_text(encoding="utf-8"), encoding="utf-8")
             self.data["artifacts"][name] = str(dest)
-            self._write()
+            self._maybe_write()
 
     def finalize(self, status: str, report_path: Optional[Path] = None) -> None:
         self.data["status"] = status
         if report_path:
             self.record_artifact("report", report_path)
         self._write()
+        if self._events_fp is not None:
+            try:
+                self._events_fp.flush()
+            except OSError:
+                pass
 
     def run_directory(self) -> Path:
         return self.run_dir
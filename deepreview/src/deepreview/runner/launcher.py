@@ -43,28 +43,41 @@ class AppLauncher:
             self.log_path.parent.mkdir(parents=True, exist_ok=True)
             self._log_file = self.log_path.open("w", encoding="utf-8")
 
+        # Raw byte pipes: the capture threads read kilobyte blocks straight
+        # off the fd instead of paying line-buffered TextIOWrapper overhead
+        # per log line.
         self.process = subprocess.Popen(
             cmd,
             cwd=self.analyzer.root_dir,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1,
+            bufsize=0,
             env=self.env,
         )
         self._start_stream_threads()
         return True
 
     def wait_for_health_check(self, timeout=15):
-        start_time = time.time()
+        deadline = time.time() + timeout
+        addr = ("127.0.0.1", self.analyzer.port)
         print(f"[Launcher] Waiting for 127.0.0.1:{self.analyzer.port}...")
-        while time.time() - start_time < timeout:
+        # connect_ex on a plain AF_INET socket skips the getaddrinfo lookup
+        # create_connection repeats per probe; the backoff starts at 50 ms so
+        # fast-booting targets don't eat a fixed half-second sleep.
+        delay = 0.05
+        while time.time() < deadline:
+            probe = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            probe.settimeout(0.2)
             try:
-                with socket.create_connection(("127.0.0.1", self.analyzer.port), timeout=1):
+                if probe.connect_ex(addr) == 0:
                     print(f"[Launcher] Port {self.analyzer.port} is OPEN.")
                     return True
-            except (ConnectionRefusedError, socket.timeout, OSError):
-                time.sleep(0.5)
+            except OSError:
+                pass
+            finally:
+                probe.close()
+            time.sleep(delay)
+            delay = min(delay * 2, 0.5)
         return False
 
     def stop(self):
@@ -97,9 +110,12 @@ class AppLauncher:
             return None, str(e)
 
     def get_recent_logs(self):
-        stdout = "\n".join(self._stdout_buffer)
-        stderr = "\n".join(self._stderr_buffer)
-        return stdout, stderr
+        # Snapshot under the lock: joining a deque while a capture thread
+        # extends it can observe a mid-mutation state.
+        with self._log_lock:
+            stdout_lines = list(self._stdout_buffer)
+            stderr_lines = list(self._stderr_buffer)
+        return "\n".join(stdout_lines), "\n".join(stderr_lines)
 
     def _start_stream_threads(self):
         if not self.process:
@@ -122,12 +138,51 @@ class AppLauncher:
     def _capture_stream(self, stream, buffer, prefix):
         if not stream:
             return
-        for line in stream:
-            cleaned = line.rstrip()
-            if cleaned:
-                buffer.append(cleaned)
-                print(f"{prefix} {cleaned}")
-                if self._log_file:
-                    with self._log_lock:
-                        self._log_file.write(f"{prefix} {cleaned}\n")
+        fd = stream.fileno()
+        pending = b""
+        # Batch decoded lines: print() flushes and takes the stdout lock per
+        # call, which serializes the two streamer threads on chatty targets.
+        batch = []
+        cleaned_batch = []
+        last_flush = time.monotonic()
+        while True:
+            try:
+                chunk = os.read(fd, 65536)
+            except OSError:
+                break
+            if not chunk:
+                break
+            pending += chunk
+            # Splitting on b"\n" is UTF-8 safe; only complete lines are
+            # decoded, so multibyte characters never straddle a decode.
+            lines = pending.split(b"\n")
+            pending = lines.pop()
+            for raw_line in lines:
+                self._emit_line(raw_line, prefix, batch, cleaned_batch)
+            if batch and (len(batch) >= 32 or time.monotonic() - last_flush > 0.1):
+                self._flush_lines(buffer, batch, cleaned_batch)
+                last_flush = time.monotonic()
+        if pending:
+            self._emit_line(pending, prefix, batch, cleaned_batch)
+        if batch:
+            self._flush_lines(buffer, batch, cleaned_batch)
         stream.close()
+
+    def _emit_line(self, raw_line, prefix, batch, cleaned_batch):
+        cleaned = raw_line.decode("utf-8", "replace").rstrip()
+        if cleaned:
+            cleaned_batch.append(cleaned)
+            batch.append(f"{prefix} {cleaned}\n")
+
+    def _flush_lines(self, buffer, batch, cleaned_batch):
+        text = "".join(batch)
+        batch.clear()
+        # One lock acquisition covers the deque extend and both writes, so
+        # get_recent_logs never sees the ring buffer mid-update.
+        with self._log_lock:
+            buffer.extend(cleaned_batch)
+            sys.stdout.write(text)
+            sys.stdout.flush()
+            if self._log_file:
+                self._log_file.write(text)
+        cleaned_batch.clear()
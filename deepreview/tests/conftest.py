@@ -0,0 +1,34 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+SRC_DIR = ROOT / "deepreview" / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+SAMPLE_CODE = (
+    "def greet(name: str):\n"
+    "    if not name:\n"
+    '        raise ValueError("name required")\n'
+    '    return f"hello {name}!"'
+)
+# Encoded once at import; write_bytes skips the per-call TextIOWrapper.
+SAMPLE_CODE_BYTES = SAMPLE_CODE.encode("utf-8")
+
+
+@pytest.fixture(scope="module")
+def parser():
+    """One argparse tree per module; parse_args does not mutate it."""
+    from deepreview import cli as cli_module
+
+    return cli_module._build_parser()
+
+
+@pytest.fixture(scope="session")
+def sample_target(tmp_path_factory):
+    """Shared sample tree, built once per session; scans only read from it."""
+    target_dir = tmp_path_factory.mktemp("app")
+    target_dir.joinpath("demo.py").write_bytes(SAMPLE_CODE_BYTES)
+    return target_dir
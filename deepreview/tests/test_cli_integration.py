@@ -1,33 +1,28 @@
 ﻿import json
 import sys
 from pathlib import Path
-import textwrap
 
 import pytest
 
-ROOT = Path(__file__).resolve().parents[2]
-SRC_DIR = ROOT / "deepreview" / "src"
-if str(SRC_DIR) not in sys.path:
-    sys.path.insert(0, str(SRC_DIR))
-
 from deepreview import cli as cli_module
 
 
-def _write_real_app(target_dir: Path):
-    code = textwrap.dedent(
-        """
-        import subprocess
+REAL_APP_CODE = (
+    "import subprocess\n"
+    "\n"
+    "def helper(cmd):\n"
+    "    subprocess.run(cmd, shell=True)\n"
+    "\n"
+    "def run_command():\n"
+    '    user_cmd = input("cmd:")\n'
+    "    helper(user_cmd)"
+)
+REAL_APP_CODE_BYTES = REAL_APP_CODE.encode("utf-8")
 
-        def helper(cmd):
-            subprocess.run(cmd, shell=True)
 
-        def run_command():
-            user_cmd = input("cmd:")
-            helper(user_cmd)
-        """
-    ).strip()
+def _write_real_app(target_dir: Path):
     target_dir.mkdir(parents=True, exist_ok=True)
-    target_dir.joinpath("real_app.py").write_text(code, encoding="utf-8")
+    target_dir.joinpath("real_app.py").write_bytes(REAL_APP_CODE_BYTES)
 
 
 def test_cli_fail_on_confirmed(monkeypatch, tmp_path):
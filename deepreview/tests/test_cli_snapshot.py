@@ -1,280 +1,250 @@
 ﻿import json
 import sys
 from pathlib import Path
-import textwrap
 
 import pytest
 import yaml
 
-ROOT = Path(__file__).resolve().parents[2]
-SRC_DIR = ROOT / "deepreview" / "src"
-if str(SRC_DIR) not in sys.path:
-    sys.path.insert(0, str(SRC_DIR))
-
 from deepreview import cli as cli_module
 
+# Bound once: main is never monkeypatched, only attributes inside the module.
+_main = cli_module.main
+
+try:  # Same optional accelerator the package uses for its own artifacts.
+    import orjson
+except ImportError:
+    orjson = None
 
-def _write_sample_module(target_dir: Path):
-    code = textwrap.dedent(
-        """
-        def greet(name: str):
-            if not name:
-                raise ValueError("name required")
-            return f"hello {name}!"
-        """
-    ).strip()
-    target_dir.joinpath("demo.py").write_text(code, encoding="utf-8")
+# libyaml-backed loader when PyYAML was built with it; scans scalars in C
+# instead of Python bytecode.
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
 
 
-def test_cli_snapshot_generates_report(monkeypatch, tmp_path):
-    target_dir = tmp_path / "app"
-    target_dir.mkdir()
-    _write_sample_module(target_dir)
+def _load_json(path: Path):
+    data = path.read_bytes()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
+
+def _workspace(tmp_path):
+    # The CLI writes its report to the cwd; callers chdir inside a scoped
+    # monkeypatch context only for the duration of the run.
     work_dir = tmp_path / "workspace"
     work_dir.mkdir()
+    return work_dir
+
+
+def _run_main(expected=0):
+    with pytest.raises(SystemExit) as excinfo:
+        _main()
+    assert excinfo.value.code == expected
+
+
+class DummyLLM:
+    """Canned-response stand-in; one class body instead of one per test."""
+
+    def __init__(self, response):
+        self._response = response
+
+    def review_changes(self, diff_content, context_content, metadata=None, protocol_hints=None, max_findings=None):
+        return self._response
+
+
+@pytest.fixture
+def patched_llm(monkeypatch):
+    def _apply(response):
+        monkeypatch.setattr(cli_module, "LLMClient", lambda *_, **__: DummyLLM(response))
+
+    return _apply
+
+
+SNAPSHOT_RESPONSE = {
+    "summary": "Functions lack error handling",
+    "insights": ["Add tests covering error branches"],
+    "findings": [
+        {
+            "title": "Missing validation",
+            "severity": "high",
+            "confidence": "medium",
+            "file": "demo.py",
+            "line": 1,
+            "description": "Function raises ValueError without logging",
+            "recommendation": "Handle bad input explicitly",
+        }
+    ],
+}
+
+
+@pytest.fixture(scope="module")
+def snapshot_run(sample_target, tmp_path_factory):
+    """Run the plain snapshot scan once; the tests only read its artifacts."""
+    mp = pytest.MonkeyPatch()
+    work_dir = tmp_path_factory.mktemp("snapshot-ws")
     metadata_path = work_dir / "run_meta.json"
-    monkeypatch.chdir(work_dir)
-    monkeypatch.setattr(
+    mp.chdir(work_dir)
+    mp.setattr(cli_module, "LLMClient", lambda *_, **__: DummyLLM(SNAPSHOT_RESPONSE))
+    mp.setattr(
         sys,
         "argv",
-        ["deepreview-cli", str(target_dir), "--metadata-path", str(metadata_path)],
+        ["deepreview-cli", str(sample_target), "--metadata-path", str(metadata_path)],
         raising=False,
     )
+    try:
+        _run_main()
+    finally:
+        mp.undo()
+    return work_dir, metadata_path
 
-    captured = {}
-
-    class DummyLLM:
-        def __init__(self, *_, **__):
-            pass
-
-        def review_changes(self, diff_content, context_content, metadata=None, protocol_hints=None, max_findings=None):
-            captured["diff_len"] = len(diff_content)
-            return {
-                "summary": "Functions lack error handling",
-                "insights": ["Add tests covering error branches"],
-                "findings": [
-                    {
-                        "title": "Missing validation",
-                        "severity": "high",
-                        "confidence": "medium",
-                        "file": "demo.py",
-                        "line": 1,
-                        "description": "Function raises ValueError without logging",
-                        "recommendation": "Handle bad input explicitly",
-                    }
-                ],
-            }
-
-    monkeypatch.setattr(cli_module, "LLMClient", lambda *_, **__: DummyLLM())
-
-    with pytest.raises(SystemExit) as excinfo:
-        cli_module.main()
-    assert excinfo.value.code == 0
 
+def test_cli_snapshot_report_contents(snapshot_run):
+    work_dir, _ = snapshot_run
     report_path = work_dir / "deepreview_report.json"
     assert report_path.exists(), "Report should be generated in workspace."
-    report = json.loads(report_path.read_text(encoding="utf-8"))
+    report = _load_json(report_path)
     assert report["status"] == "completed"
     assert report["analysis"]["source"] == "snapshot"
     assert report["analysis"]["summary"].startswith("Functions")
     assert report["analysis"]["llm_findings"]
     assert report["analysis"]["llm_findings"][0]["title"] == "Missing validation"
-    assert "audit_findings" in report["analysis"]
-    assert "style_findings" in report["analysis"]
-    assert "taint_findings" in report["analysis"]
-    assert "project" in report["analysis"]
+    required = {"audit_findings", "style_findings", "taint_findings", "project", "severity_summary"}
+    missing = required - report["analysis"].keys()
+    assert not missing, f"missing analysis sections: {missing}"
     assert "project_metadata" in report["analysis"]["metadata"]
-    assert "severity_summary" in report["analysis"]
-    artifacts = report.get("artifacts", {})
-    sarif_path = Path(artifacts["sarif"])
-    assert sarif_path.exists()
+    assert Path(report["artifacts"]["sarif"]).exists()
+
+
+def test_cli_snapshot_metadata(snapshot_run):
+    work_dir, metadata_path = snapshot_run
     assert metadata_path.exists()
-    meta = json.loads(metadata_path.read_text(encoding="utf-8"))
+    report = _load_json(work_dir / "deepreview_report.json")
+    meta = _load_json(metadata_path)
     assert meta["status"] == report["status"]
-    assert meta["run_directory"] == artifacts["run_directory"]
+    assert meta["run_directory"] == report["artifacts"]["run_directory"]
     assert meta["details"]["heuristic_findings"] == len(report["analysis"]["audit_findings"])
     assert meta["details"]["style_findings"] == len(report["analysis"]["style_findings"])
     assert meta["details"]["taint_findings"] == len(report["analysis"]["taint_findings"])
     assert "severity_summary" in meta["details"]
 
 
-def test_cli_config_targets(monkeypatch, tmp_path):
-    target_dir = tmp_path / "app"
-    target_dir.mkdir()
-    _write_sample_module(target_dir)
+def test_cli_config_targets(monkeypatch, tmp_path, sample_target, patched_llm):
+    target_dir = sample_target
 
-    work_dir = tmp_path / "workspace"
-    work_dir.mkdir()
+    work_dir = _workspace(tmp_path)
 
     config_path = tmp_path / "deepreview.yml"
     metadata_path = work_dir / "cfg-meta.json"
     archive_path = work_dir / "cfg-run.zip"
-    config_path.write_text(
-        textwrap.dedent(
-            f"""
-            defaults:
-              metadata_path: "{metadata_path.as_posix()}"
-              fail_on_confirmed: false
-              scan_mode: quick
-            targets:
-              - path: "{target_dir.as_posix()}"
-                run_name: "cfg-run"
-                archive_run: "{archive_path.as_posix()}"
-            """
-        ).strip(),
-        encoding="utf-8",
-    )
-
-    monkeypatch.chdir(work_dir)
-    monkeypatch.setattr(sys, "argv", ["deepreview-cli", "--config", str(config_path)], raising=False)
-
-    class DummyLLM:
-        def __init__(self, *_, **__):
-            pass
-
-        def review_changes(self, diff_content, context_content, metadata=None, protocol_hints=None, max_findings=None):
-            return {
-                "summary": "Sample",
-                "insights": [],
-                "findings": [
-                    {
-                        "title": "Stub",
-                        "severity": "medium",
-                        "confidence": "high",
-                        "file": "demo.py",
-                        "line": 1,
-                        "description": "desc",
-                        "recommendation": "fix",
-                    }
-                ],
+    # A dict dumped by libyaml sidesteps f-string templating and any quoting
+    # surprises in the embedded paths.
+    cfg = {
+        "defaults": {
+            "metadata_path": metadata_path.as_posix(),
+            "fail_on_confirmed": False,
+            "scan_mode": "quick",
+        },
+        "targets": [
+            {
+                "path": target_dir.as_posix(),
+                "run_name": "cfg-run",
+                "archive_run": archive_path.as_posix(),
             }
+        ],
+    }
+    config_path.write_bytes(yaml.dump(cfg, Dumper=_YAML_DUMPER, encoding="utf-8"))
+
+    patched_llm(
+        {
+            "summary": "Sample",
+            "insights": [],
+            "findings": [
+                {
+                    "title": "Stub",
+                    "severity": "medium",
+                    "confidence": "high",
+                    "file": "demo.py",
+                    "line": 1,
+                    "description": "desc",
+                    "recommendation": "fix",
+                }
+            ],
+        }
+    )
 
-    monkeypatch.setattr(cli_module, "LLMClient", lambda *_, **__: DummyLLM())
+    with monkeypatch.context() as mp:
+        mp.chdir(work_dir)
+        mp.setattr(sys, "argv", ["deepreview-cli", "--config", str(config_path)], raising=False)
+        _run_main()
 
-    with pytest.raises(SystemExit) as excinfo:
-        cli_module.main()
-    assert excinfo.value.code == 0
-
-    report = json.loads((work_dir / "deepreview_report.json").read_text(encoding="utf-8"))
+    report = _load_json(work_dir / "deepreview_report.json")
     artifacts = report.get("artifacts", {})
     assert Path(artifacts["sarif"]).exists()
     assert report["analysis"].get("scan_mode") == "quick"
-    assert "audit_findings" in report["analysis"]
-    assert "style_findings" in report["analysis"]
-    assert "taint_findings" in report["analysis"]
+    missing = {"audit_findings", "style_findings", "taint_findings"} - report["analysis"].keys()
+    assert not missing, f"missing analysis sections: {missing}"
     assert metadata_path.exists()
     assert archive_path.exists()
 
 
-def test_cli_writes_summary_markdown(monkeypatch, tmp_path):
-    target_dir = tmp_path / "app"
-    target_dir.mkdir()
-    _write_sample_module(target_dir)
+@pytest.mark.parametrize("mode", ["arg", "env"])
+def test_cli_writes_summary(mode, monkeypatch, tmp_path, sample_target, patched_llm, parser):
+    target_dir = sample_target
 
-    work_dir = tmp_path / "workspace"
-    work_dir.mkdir()
+    work_dir = _workspace(tmp_path)
     summary_path = work_dir / "summary.md"
-    monkeypatch.chdir(work_dir)
-
-    class DummyLLM:
-        def __init__(self, *_, **__):
-            pass
-
-        def review_changes(self, diff_content, context_content, metadata=None, protocol_hints=None, max_findings=None):
-            return {
-                "summary": "Summary section",
-                "insights": [],
-                "findings": [
-                    {
-                        "title": "Style issue",
-                        "severity": "low",
-                        "confidence": "medium",
-                        "file": "demo.py",
-                        "line": 1,
-                        "description": "desc",
-                        "recommendation": "n/a",
-                    }
-                ],
-            }
 
-    monkeypatch.setattr(cli_module, "LLMClient", lambda *_, **__: DummyLLM())
+    patched_llm(
+        {
+            "summary": "Summary section",
+            "insights": [],
+            "findings": [
+                {
+                    "title": "Style issue",
+                    "severity": "low",
+                    "confidence": "medium",
+                    "file": "demo.py",
+                    "line": 1,
+                    "description": "desc",
+                    "recommendation": "n/a",
+                }
+            ],
+        }
+    )
 
-    parser = cli_module._build_parser()
-    args = parser.parse_args([str(target_dir), "--summary-path", str(summary_path)])
+    if mode == "arg":
+        args = parser.parse_args([str(target_dir), "--summary-path", str(summary_path)])
+    else:
+        monkeypatch.setenv("GITHUB_STEP_SUMMARY", str(summary_path))
+        args = parser.parse_args([str(target_dir)])
 
-    exit_code = cli_module.run_scan(args)
+    with monkeypatch.context() as mp:
+        mp.chdir(work_dir)
+        exit_code = cli_module.run_scan(args)
     assert exit_code in (0, 2)
     assert summary_path.exists()
-    assert "Severity distribution" in summary_path.read_text(encoding="utf-8")
-
-
-def test_cli_writes_github_summary(monkeypatch, tmp_path):
-    target_dir = tmp_path / "app"
-    target_dir.mkdir()
-    _write_sample_module(target_dir)
-
-    work_dir = tmp_path / "workspace"
-    work_dir.mkdir()
-    step_summary = work_dir / "gh-summary.md"
-    monkeypatch.chdir(work_dir)
-    monkeypatch.setenv("GITHUB_STEP_SUMMARY", str(step_summary))
-
-    class DummyLLM:
-        def __init__(self, *_, **__):
-            pass
-
-        def review_changes(self, diff_content, context_content, metadata=None, protocol_hints=None, max_findings=None):
-            return {
-                "summary": "Summary section",
-                "insights": [],
-                "findings": [
-                    {
-                        "title": "Style issue",
-                        "severity": "low",
-                        "confidence": "medium",
-                        "file": "demo.py",
-                        "line": 1,
-                        "description": "desc",
-                        "recommendation": "n/a",
-                    }
-                ],
-            }
-
-    monkeypatch.setattr(cli_module, "LLMClient", lambda *_, **__: DummyLLM())
-
-    parser = cli_module._build_parser()
-    args = parser.parse_args([str(target_dir)])
-
-    exit_code = cli_module.run_scan(args)
-    assert exit_code in (0, 2)
-    assert step_summary.exists()
-    assert "Severity distribution" in step_summary.read_text(encoding="utf-8")
+    assert b"Severity distribution" in summary_path.read_bytes()
 
 def test_cli_init_config_generates_template(monkeypatch, tmp_path):
     repo = tmp_path / 'repo'
-    repo.mkdir()
     pkg = repo / 'pkg'
-    pkg.mkdir()
-    pkg.joinpath('sample.py').write_text("print('hi')", encoding='utf-8')
+    pkg.mkdir(parents=True)
+    pkg.joinpath('sample.py').write_bytes(b"print('hi')")
 
-    init_dir = tmp_path / 'workspace'
-    init_dir.mkdir()
+    init_dir = _workspace(tmp_path)
     config_path = init_dir / 'deepreview.yml'
 
-    monkeypatch.chdir(init_dir)
-    monkeypatch.setattr(
-        sys,
-        'argv',
-        ['deepreview-cli', str(repo), '--init-config', str(config_path)],
-        raising=False,
-    )
-
-    with pytest.raises(SystemExit) as excinfo:
-        cli_module.main()
-    assert excinfo.value.code == 0
-
-    data = yaml.safe_load(config_path.read_text(encoding='utf-8'))
+    with monkeypatch.context() as mp:
+        mp.chdir(init_dir)
+        mp.setattr(
+            sys,
+            'argv',
+            ['deepreview-cli', str(repo), '--init-config', str(config_path)],
+            raising=False,
+        )
+        _run_main()
+
+    data = yaml.load(config_path.read_bytes(), Loader=_YAML_LOADER)
     assert 'defaults' in data
     assert 'targets' in data
     assert data['targets'][0]['path'] == '.'
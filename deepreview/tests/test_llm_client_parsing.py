@@ -1,47 +1,47 @@
-import sys
-from pathlib import Path
-
-ROOT = Path(__file__).resolve().parents[2]
-SRC_DIR = ROOT / "deepreview" / "src"
-if str(SRC_DIR) not in sys.path:
-    sys.path.insert(0, str(SRC_DIR))
+import pytest
 
 from deepreview.core.llm_client import LLMClient
 
+PROSE_RESPONSE = (
+    "Sure — here is the JSON payload:\n"
+    '{\n  "summary": "ok",\n  "insights": [],\n  "findings": []\n}\n'
+    "Thanks."
+)
+FENCE_RESPONSE = "```json\n{\"summary\":\"ok\",\"insights\":[],\"findings\":[]}\n```"
+LIST_RESPONSE = (
+    "[\n"
+    "  {\"title\":\"T\",\"severity\":\"high\",\"confidence\":\"low\",\"file\":\"a.py\",\"line\":1,"
+    "\"description\":\"d\",\"recommendation\":\"r\"}\n"
+    "]"
+)
+
+# Allocated once at import; the parser returns the payload unmodified, so a
+# single C-level dict equality replaces the per-key asserts.
+EXPECTED_PAYLOAD = {"summary": "ok", "insights": [], "findings": []}
+
+CASES = [
+    ("prose", PROSE_RESPONSE, EXPECTED_PAYLOAD),
+    ("fence", FENCE_RESPONSE, EXPECTED_PAYLOAD),
+    ("list", LIST_RESPONSE, None),
+]
+
 
 def _client() -> LLMClient:
     return object.__new__(LLMClient)
 
 
-def test_parse_review_response_extracts_json_from_prose():
-    client = _client()
-    response = (
-        "Sure — here is the JSON payload:\n"
-        '{\n  "summary": "ok",\n  "insights": [],\n  "findings": []\n}\n'
-        "Thanks."
-    )
-    parsed = client._parse_review_response(response, max_findings=None)
-    assert parsed is not None
-    assert parsed["summary"] == "ok"
-
-
-def test_parse_review_response_extracts_json_from_fence():
-    client = _client()
-    response = "```json\n{\"summary\":\"ok\",\"insights\":[],\"findings\":[]}\n```"
-    parsed = client._parse_review_response(response, max_findings=None)
+@pytest.mark.parametrize("label,response,expected", CASES, ids=[c[0] for c in CASES])
+def test_parse_review_response(label, response, expected):
+    parsed = _client()._parse_review_response(response, max_findings=None)
     assert parsed is not None
-    assert parsed["summary"] == "ok"
+    if expected is not None:
+        assert parsed == expected
+    else:
+        assert parsed["findings"]
+        assert parsed["findings"][0]["title"] == "T"
 
 
-def test_parse_review_response_accepts_top_level_list():
+def test_extract_fenced_payload_matches_json_fence():
     client = _client()
-    response = (
-        "[\n"
-        "  {\"title\":\"T\",\"severity\":\"high\",\"confidence\":\"low\",\"file\":\"a.py\",\"line\":1,"
-        "\"description\":\"d\",\"recommendation\":\"r\"}\n"
-        "]"
-    )
-    parsed = client._parse_review_response(response, max_findings=None)
-    assert parsed is not None
-    assert parsed["findings"]
-    assert parsed["findings"][0]["title"] == "T"
+    text = "Intro prose.\n```json\n{\"summary\": \"ok\"}\n```\nOutro."
+    assert client._extract_fenced_payload(text) == '{"summary": "ok"}'
@@ -1,11 +1,3 @@
-import sys
-from pathlib import Path
-
-ROOT = Path(__file__).resolve().parents[2]
-SRC_DIR = ROOT / "deepreview" / "src"
-if str(SRC_DIR) not in sys.path:
-    sys.path.insert(0, str(SRC_DIR))
-
 from deepreview.core.protocols import ProtocolAdvisor
 
 